@@ -0,0 +1,81 @@
+import sys
+import ast
+import json
+import fileinput
+import multiprocessing
+from collections import deque
+
+# ------------------------------------------------------------------------------- #
+
+# Streaming mode for the __main__ blocks: many formulas in one process. Formulas
+# are read one per line, as JSON or as the Python literal typed at the prompt,
+# from files or stdin, and every result goes out as one line of JSON as soon as
+# it and the ones before it are ready. With workers > 1 the lines are spread
+# over a pool of processes, with at most 2 * workers of them in flight, so
+# memory stays bounded however long the input is.
+
+def addBatchArguments(parser):
+    parser.add_argument("--batch", nargs="*", metavar="FILE",
+                        help="read one formula per line from the files (default: stdin) and write one result per line")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of processes for --batch")
+
+# runs function(formula, *extra) on every line and prints the results
+def runBatch(function, files, workers=1, extra=()):
+    tasks = ((function, line, extra) for line in readLines(files))
+    for result in imapBounded(call, tasks, workers):
+        sys.stdout.write(json.dumps(result) + "\n")
+        sys.stdout.flush()
+
+def readLines(files):
+    for line in fileinput.input(files):
+        line = line.strip()
+        if line:
+            yield line
+
+# json gives unicode strings under Python 2, but formulas are checked for str
+def plain(x):
+    if type(x) is list:
+        return [plain(i) for i in x]
+    if type(x) is type(u""):
+        return str(x)
+    return x
+
+def parseLine(line):
+    try:
+        return plain(json.loads(line))
+    except ValueError:
+        return ast.literal_eval(line)
+
+# one line of a batch; errors are reported as {"error": ...} in place of the
+# result, so that one bad line does not end the batch, and an error line coming
+# from an earlier stage of a pipeline is passed on as it is
+def call(task):
+    function, line, extra = task
+    try:
+        formula = parseLine(line)
+        if type(formula) is dict:
+            return formula
+        return function(formula, *extra)
+    except Exception as e:
+        return {"error": "%s: %s" % (type(e).__name__, e)}
+
+# function applied to every item, in order; with workers > 1 on a pool of
+# processes that is never more than 2 * workers items ahead of the output
+def imapBounded(function, items, workers=1):
+    if workers <= 1:
+        for item in items:
+            yield function(item)
+        return
+    pool = multiprocessing.Pool(workers)
+    try:
+        pending = deque()
+        for item in items:
+            pending.append(pool.apply_async(function, (item,)))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+    finally:
+        pool.terminate()
+        pool.join()
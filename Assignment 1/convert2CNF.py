@@ -1,6 +1,9 @@
 import sys
+import argparse
 import fileinput
 
+from batch import addBatchArguments, runBatch
+
 # ------------------------------------------------------------------------------- #
 
 
@@ -17,173 +20,154 @@ def parseInput(wff):
 
 # ------------------------------------------------------------------------------- #
 
-# If phi has the form P <-> Q, then:
-  # Return CONVERT((P ^ Q) v (~P ^ ~Q))
-def removeIFF(wff):
-    result = []
-    if type(wff) is str:
-        return wff
-    elif type(wff) is list and wff[0] == "iff":
-        result.append("and")
-        result.append(["if",removeIFF(wff[1]),removeIFF(wff[2])])
-        result.append(["if",removeIFF(wff[2]),removeIFF(wff[1])])
-        return result
-    else:
-        result.append(wff[0])
-        result += (removeIFF(i) for i in wff[1:])
-        return result
-
-# ------------------------------------------------------------------------------- #
-
-# If alpha has the form P -> Q, then:
-  # Return CONVERT(~P v Q)
-def removeIMPLIES(wff):
-    if type(wff) is str:
-        return wff
-    elif type(wff) is list and wff[0] == "if":
-        return(["or",
-                ["not",
-                 removeIMPLIES(wff[1])],
-                removeIMPLIES(wff[2])])
-    else:
-        return([wff[0]] + [removeIMPLIES(i) for i in wff[1:]])
-
-# ------------------------------------------------------------------------------- #
-
-def doubleNegationElimination(wff):
-    if type(wff) is str:
-        return wff
-    elif type(wff) is list and wff[0] == "not" and type(wff[1]) is list and wff[1][0] == "not":
-        return(doubleNegationElimination(wff[1][1]))
-    else:
-        return([wff[0]] + [doubleNegationElimination(i) for i in wff[1:]])
-
-# ------------------------------------------------------------------------------- #
-
-def check_demorgan(wff):
-    parsed_wff = demorgan(wff)
-    if parsed_wff == wff:
-        # No more ops possible
-        return wff
-    else:
-        # For inner clauses
-        return check_demorgan(parsed_wff)
- 
-# If alpha has the form ~(~P), then return CONVERT(P)   
-def demorgan(wff):
-    if type(wff) is str:
-        return wff
-    elif type(wff) is list and wff[0] == "not" and type(wff[1]) is list and wff[1][0] == "and":
-        # If alpha has the form ~(P ^ Q), then return CONVERT(~P v ~Q)
-        return(["or"] + [check_demorgan(["not", i]) for i in wff[1][1:]])
-    elif type(wff) is list and wff[0] == "not" and type(wff[1]) is list and wff[1][0] == "or":
-        # If alpha has the form ~(P v Q), then return CONVERT(~P ^ ~Q)
-        return(["and"] + [check_demorgan(["not", i]) for i in wff[1][1:]])
-    else:
-        return ([wff[0]] + [check_demorgan(i) for i in wff[1:]])
-
-# ------------------------------------------------------------------------------- #
-
-# if alpha has the form (and,P,Q,R) then return (and,(and,P,Q),R)
-# if alpha has the form (or,P,Q,R) then return (or,(or,P,Q),R)
-def binaryize(wff): # ensures all connectives are binary (and / or)
-    result = [];
-    if type(wff) is str:
-        return wff
-    elif type(wff) is list and wff[0] == "and" and len(wff) > 3: # too long
-        result.append("and");
-        result.append(wff[1]);
-        result.append(binaryize(["and"] + wff[2:]));
-        # return(["and", wff[1], binaryize(["and"] + wff[2:])])
-        return result;
-    elif type(wff) is list and wff[0] == "or" and len(wff) > 3:
-     # too long
-        result.append("or");
-        result.append(wff[1]);
-        result.append(binaryize(["or"] + wff[2:]));
-        # return(["or", wff[1], binaryize(["or"] + wff[2:])])
-        return result;
-    else:
-        return([wff[0]] + [binaryize(i) for i in wff[1:]])
-    
-# ------------------------------------------------------------------------------- #
-
-# if alpha has the form (or,(and,P,Q),R) then return (and,(or,P,R),(or,Q,R))
-def check_distributivity(wff):
-    parsed_wff = distribute(wff)
-    if parsed_wff == wff: 
-        # No fuurther distribution possible
-        return wff
-    else:
-        # Distribute inner clauses
-        return check_distributivity(parsed_wff)
-    
-
-def distribute(wff): # only works on binary connectives
-    if type(wff) is str:
-        return wff
-    elif type(wff) is list and wff[0] == "or" and type(wff[1]) is list and wff[1][0] == "and":
-        # distribute wff[2] over wff[1]
-        return(["and"] + [check_distributivity(["or", i, wff[2]]) for i in wff[1][1:]])
-    elif type(wff) is list and wff[0] == "or" and type(wff[2]) is list and wff[2][0] == "and":
-        # distribute wff[1] over wff[2]
-        return(["and"] + [check_distributivity(["or", i, wff[1]]) for i in wff[2][1:]])
-    else:
-        return ([wff[0]] + [check_distributivity(i) for i in wff[1:]])
-
-# ------------------------------------------------------------------------------- #
-
-def check_orAssociativity(wff):
-    parsed_wff = orAssociativity(wff)
-    if parsed_wff == wff:
-        # No more ops possible
-        return wff
-    else:
-        # For inner clauses
-        return check_orAssociativity(parsed_wff)
-
-# Opposite of Binaryize 
-def orAssociativity(wff):
-    if type(wff) is str:
-        return wff
-    elif type(wff) is list and wff[0] == "or":
-        result = ["or"]
-        # iterate through disjuncts looking for "or" lists
-        for i in wff[1:]:
-            if type(i) is list and i[0] == "or":
-                result = result + i[1:]
+# Hash-consed formulas: each distinct subformula is stored once and referred to
+# by its index. An atom is stored as its name and anything else as a tuple
+# (op, argument indices...), so identical subformulas get the same index and a
+# transformation memoized by index handles each of them once.
+class FormulaTable:
+    def __init__(self):
+        self.nodes = [] # index -> atom name or (op, argument indices...)
+        self.index = {} # the reverse
+
+    def node(self, key):
+        i = self.index.get(key)
+        if i is None:
+            i = len(self.nodes)
+            self.nodes.append(key)
+            self.index[key] = i
+        return i
+
+    # interns a nested-list wff and returns the index of its root; a list
+    # object that occurs several times in wff is only walked once
+    def intern(self, wff):
+        seen = {} # id of a list already interned -> its index
+        done = []
+        stack = [(wff, False)]
+        while stack:
+            w, expanded = stack.pop()
+            if type(w) is str:
+                done.append(self.node(w))
+            elif id(w) in seen:
+                done.append(seen[id(w)])
+            elif not expanded:
+                stack.append((w, True))
+                for i in reversed(w[1:]):
+                    stack.append((i, False))
             else:
-                result.append(i)
-        return result
-    else:
-        return([wff[0]] + [orAssociativity(i) for i in wff[1:]])
+                n = len(w) - 1
+                args = tuple(done[len(done) - n:])
+                del done[len(done) - n:]
+                seen[id(w)] = self.node((w[0],) + args)
+                done.append(seen[id(w)])
+        return done[0]
 
 # ------------------------------------------------------------------------------- #
 
-def check_andAssociativity(wff):
-    parsed_wff = andAssociativity(wff)
-    if parsed_wff == wff:
-        # No more ops possible
-        return wff
-    else:
-        # For inner clauses
-        return check_andAssociativity(parsed_wff)
-
-# Opposite of Binaryize     
-def andAssociativity(wff):
-    if type(wff) is str:
-        return wff
-    elif type(wff) is list and wff[0] == "and":
-        result = ["and"]
-        # iterate through conjuncts looking for "and" lists
-        for i in wff[1:]:
-            if type(i) is list and i[0] == "and":
-                result = result + i[1:]
+# Rewrites the wff into a list of clauses, each a list of literals, in one
+# bottom-up pass over an explicit stack. Negations are pushed down on the way
+# in ("if" and "iff" expanded, De Morgan applied, double negations dropped) and
+# on the way out "and" joins the clause lists of its arguments while "or"
+# distributes over them, so the result comes out flat. Chains of the same
+# operator are flattened on the way in, so that each "and" copies its clauses
+# once rather than once per level. Subformulas are interned first, and those
+# used more than once are rewritten once per polarity and remembered; the rest
+# are forgotten as soon as their parent has used them.
+def normalize(wff):
+    table = FormulaTable()
+    nodes = table.nodes
+    root = table.intern(wff)
+    shared = sharedNodes(nodes)
+    memo = {} # (index, negated) -> clause list, for shared subformulas only
+    done = [] # clause lists of the finished subformulas, in order
+    stack = [(root, False, None, 0)] # (subformula, negated, its operator and arity once the arguments are pushed)
+    while stack:
+        i, negated, op, n = stack.pop()
+        w = nodes[i]
+        if op is None and (i, negated) in memo:
+            done.append(memo[(i, negated)])
+        elif type(w) is str:
+            done.append([[["not", w] if negated else w]])
+        elif w[0] == "not":
+            stack.append((w[1], not negated, None, 0))
+        elif op is None:
+            op, children = split(w, negated)
+            if op != "iff":
+                children = operands(nodes, shared, op, children)
+            stack.append((i, negated, op, len(children)))
+            for child in reversed(children):
+                stack.append(child + (None, 0))
+        else:
+            args = done[len(done) - n:]
+            del done[len(done) - n:]
+            if op == "iff":
+                p, not_p, q, not_q = args
+                if negated:
+                    # ~(P <-> Q) is (P v Q) ^ (~P v ~Q)
+                    done.append(conjunction([disjunction([p, q]), disjunction([not_p, not_q])]))
+                else:
+                    # P <-> Q is (~P v Q) ^ (P v ~Q)
+                    done.append(conjunction([disjunction([not_p, q]), disjunction([p, not_q])]))
+            elif op == "and":
+                done.append(conjunction(args))
             else:
-                result.append(i)
-        return result
-    else:
-        return([wff[0]] + [andAssociativity(i) for i in wff[1:]])
+                done.append(disjunction(args))
+            if shared[i]:
+                memo[(i, negated)] = done[-1]
+    return done[0]
+
+# whether each interned subformula is used more than once; "iff" uses both of
+# its arguments twice, once per polarity
+def sharedNodes(nodes):
+    uses = [0] * len(nodes)
+    for w in nodes:
+        if type(w) is tuple:
+            for a in w[1:]:
+                uses[a] += 2 if w[0] == "iff" else 1
+    return [u > 1 for u in uses]
+
+# the operator a subformula amounts to once the negation is pushed in, and its
+# arguments as (index, negated) pairs; "iff" takes both polarities of both
+def split(w, negated):
+    if w[0] == "iff":
+        return "iff", [(w[1], False), (w[1], True), (w[2], False), (w[2], True)]
+    if w[0] == "if":
+        # P -> Q is ~P v Q, and ~(P -> Q) is P ^ ~Q
+        return ("and" if negated else "or"), [(w[1], not negated), (w[2], negated)]
+    return (w[0] if not negated else {"and": "or", "or": "and"}[w[0]]), [(a, negated) for a in w[1:]]
+
+# the arguments of an op ("and" or "or") node, with every argument that is the
+# same op and used nowhere else replaced by its own arguments, in order
+def operands(nodes, shared, op, children):
+    flat = []
+    todo = children[::-1]
+    while todo:
+        i, negated = todo.pop()
+        while type(nodes[i]) is tuple and nodes[i][0] == "not" and not shared[i]:
+            i, negated = nodes[i][1], not negated
+        w = nodes[i]
+        if type(w) is tuple and w[0] in ("and", "or", "if") and not shared[i]:
+            inner, args = split(w, negated)
+            if inner == op:
+                todo.extend(args[::-1])
+                continue
+        flat.append((i, negated))
+    return flat
+
+# the clauses of P ^ Q ^ ... are all the clauses of P, Q, ...
+def conjunction(args):
+    return [c for a in args for c in a]
+
+# if alpha has the form (or,(and,P,Q),R) then return (and,(or,P,R),(or,Q,R));
+# the clauses being built are new lists, so a single clause is added in place
+def disjunction(args):
+    result = [[]]
+    for a in args:
+        if len(a) == 1:
+            for r in result:
+                r.extend(a[0])
+        else:
+            result = [r + c for r in result for c in a]
+    return result
 
 # ------------------------------------------------------------------------------- #
 
@@ -195,12 +179,14 @@ def removeDuplicateLiterals(wff):
     if wff[0] == "and":
         return(["and"] + [removeDuplicateLiterals(i) for i in wff[1:]])
     if wff[0] == "or":
+        seen = set()
         remains = []
         for l in wff[1:]:
-            if l not in remains:
+            if literalKey(l) not in seen:
+                seen.add(literalKey(l))
                 remains.append(l)
         if len(remains) == 1:
-            return remainwff[0]
+            return remains[0]
         else:
             return(["or"] + remains)
 
@@ -212,29 +198,41 @@ def removeDuplicateClauses(wff):
     elif wff[0] == "not":
         return wff
     elif wff[0] == "or":
+        if tautology(clauseKey(wff)):
+            return ["and"]
         return wff
     elif wff[0] == "and": #conjunction of clauses
+        seen = set()
         remains = []
         for c in wff[1:]:
-            if unique(c, remains):
+            key = clauseKey(c)
+            if key not in seen and not tautology(key):
+                seen.add(key)
                 remains.append(c)
         if len(remains) == 1:
-            return remainwff[0]
+            return remains[0]
         else:
             return(["and"] + remains)
     else:
         return wff
 
-# check for unique clauses
-def unique(c, remains):
-    for p in remains:
-        if type(c) is str or type(p) is str:
-            if c == p:
-                return False
-        elif len(c) == len(p):
-            if len([i for i in c[1:] if i not in p[1:]]) == 0:
-                return False
-    return True
+# a literal as a hashable (name, positive) pair
+def literalKey(l):
+    if type(l) is str:
+        return (l, True)
+    else:
+        return (l[1], False)
+
+# a clause as a set of literal keys, so that clauses equal up to order and
+# repetition hash alike
+def clauseKey(c):
+    if type(c) is str or c[0] == "not":
+        return frozenset([literalKey(c)])
+    return frozenset(literalKey(l) for l in c[1:])
+
+# a clause with both p and ~p is always true
+def tautology(key):
+    return any((name, False) in key for name, positive in key if positive)
 
 # ------------------------------------------------------------------------------- #     
     
@@ -260,29 +258,146 @@ def parseOutput(cnf):
 
 # ------------------------------------------------------------------------------- #  
 
-def cnf(wff):
-    wff = removeIFF(wff)
-    wff = removeIMPLIES(wff)
-    wff = check_demorgan(wff)
-    wff = doubleNegationElimination(wff)
-    wff = binaryize(wff)
-    wff = check_distributivity(wff)
-    wff = check_andAssociativity(wff)
-    wff = check_orAssociativity(wff)
+# Definitional (Tseitin) encoding: every and / or / if / iff subformula gets a
+# fresh variable defined by a few clauses, so the CNF stays linear in the size
+# of the formula; identical subformulas share one variable. With polarity=True
+# only the half of each definition that the subformula's polarity needs is
+# emitted (Plaisted-Greenbaum): fewer clauses, same satisfiability, and every
+# model still maps back to the original formula.
+
+def negate(literal):
+    if type(literal) is str:
+        return ["not", literal]
+    else:
+        return literal[1]
+
+# returns (cnf, fresh): the CNF in the same ["and", ["or", ...], ...] form as
+# cnf(), and the list of variables it introduced
+def tseitin(wff, polarity=False):
+    table = FormulaTable()
+    nodes = table.nodes
+    root = table.intern(wff)
+    names = set(w for w in nodes if type(w) is str)
+    fresh = []
+    defined = {}  # index of a subformula -> [its variable, v -> wff emitted, wff -> v emitted]
+    clauses = []
+
+    def literal(i):
+        negated = False
+        while type(nodes[i]) is tuple and nodes[i][0] == "not":
+            i = nodes[i][1]
+            negated = not negated
+        if type(nodes[i]) is str:
+            lit = nodes[i]
+        else:
+            if i not in defined:
+                name = "_t%d" % (len(fresh) + 1)
+                while name in names:
+                    name = "_" + name
+                fresh.append(name)
+                defined[i] = [name, False, False]
+            lit = defined[i][0]
+        return negate(lit) if negated else lit
+
+    def emit(*lits):
+        clause = []
+        for l in lits:
+            if negate(l) in clause:
+                return
+            if l not in clause:
+                clause.append(l)
+        clauses.append(["or"] + clause)
+
+    stack = [(root, 1)]  # (subformula, polarity: 1 positive, -1 negative, 0 both)
+    root = literal(root)
+    while stack:
+        i, pol = stack.pop()
+        while type(nodes[i]) is tuple and nodes[i][0] == "not":
+            i = nodes[i][1]
+            pol = -pol
+        w = nodes[i]
+        if type(w) is str:
+            continue
+        entry = defined[i]
+        v = entry[0]
+        args = [literal(a) for a in w[1:]]
+        # direction 1 is v -> w, direction -1 is w -> v
+        for d in (1, -1):
+            if polarity and pol == -d:
+                continue
+            if entry[1 if d == 1 else 2]:
+                continue
+            entry[1 if d == 1 else 2] = True
+            if w[0] == "and":
+                if d == 1:
+                    for a in args:
+                        emit(negate(v), a)
+                else:
+                    emit(v, *[negate(a) for a in args])
+                stack.extend((i, d) for i in w[1:])
+            elif w[0] == "or":
+                if d == 1:
+                    emit(negate(v), *args)
+                else:
+                    for a in args:
+                        emit(v, negate(a))
+                stack.extend((i, d) for i in w[1:])
+            elif w[0] == "if":
+                if d == 1:
+                    emit(negate(v), negate(args[0]), args[1])
+                else:
+                    emit(v, args[0])
+                    emit(v, negate(args[1]))
+                stack.extend([(w[1], -d), (w[2], d)])
+            elif w[0] == "iff":
+                if d == 1:
+                    emit(negate(v), negate(args[0]), args[1])
+                    emit(negate(v), args[0], negate(args[1]))
+                else:
+                    emit(v, args[0], args[1])
+                    emit(v, negate(args[0]), negate(args[1]))
+                stack.extend([(w[1], 0), (w[2], 0)])
+    emit(root)
+    return ["and"] + clauses, fresh
+
+# drops the fresh variables of tseitin() from a model (a list of literals)
+def projectModel(model, fresh):
+    if model == False:
+        return model
+    fresh = set(fresh)
+    return [l for l in model if (l if type(l) is str else l[1]) not in fresh]
+
+# ------------------------------------------------------------------------------- #  
+
+def cnf(wff, encoding="distribute"):
+    # "tseitin" and "pg" introduce fresh variables; see tseitin()
+    if encoding != "distribute":
+        return tseitin(wff, encoding == "pg")[0]
+    clauses = normalize(wff)
+    wff = ["and"] + [["or"] + c if len(c) > 1 else c[0] for c in clauses]
+    if len(clauses) == 1:
+        wff = wff[1]
     wff = removeDuplicateLiterals(wff)
     wff = removeDuplicateClauses(wff)
     wff = parseOutput(wff)
     # wff = binaryize(wff)
     return wff
 
+# one formula of a batch, as typed at the prompt
+def batchCNF(wff, encoding):
+    return cnf(parseInput(wff), encoding)
+
 # ------------------------------------------------------------------------------- #
 
 if __name__ == "__main__":
-    print("Enter a WFF:")
-    wff = input()
-    print("Output in CNF:")
-    print repr(cnf(parseInput(wff)))
-    # sentences = fileinput.input()
-    # for l in sentences:
-    #     wff = parseInput(eval(l.strip()))
-    #     print repr(cnf(wff))
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Convert WFFs to CNF.")
+    parser.add_argument("encoding", nargs="?", default="distribute", choices=["distribute", "tseitin", "pg"])
+    addBatchArguments(parser)
+    args = parser.parse_args()
+    if args.batch is not None:
+        runBatch(batchCNF, args.batch, args.workers, (args.encoding,))
+    else:
+        print("Enter a WFF:")
+        wff = input()
+        print("Output in CNF:")
+        print repr(cnf(parseInput(wff), args.encoding))
\ No newline at end of file
@@ -1,6 +1,9 @@
 import sys
+import argparse
 import fileinput
 
+from batch import addBatchArguments, runBatch
+
 
 # ------------------------------------------------------------------------------- #
 
@@ -18,173 +21,204 @@ def parseInput(wff):
 
 # ------------------------------------------------------------------------------- #
 
-# If phi has the form P <-> Q, then:
-  # Return CONVERT((P ^ Q) v (~P ^ ~Q))
-def removeIFF(wff):
-    result = []
-    if type(wff) is str:
-        return wff
-    elif type(wff) is list and wff[0] == "iff":
-        result.append("and")
-        result.append(["if",removeIFF(wff[1]),removeIFF(wff[2])])
-        result.append(["if",removeIFF(wff[2]),removeIFF(wff[1])])
-        return result
-    else:
-        result.append(wff[0])
-        result += (removeIFF(i) for i in wff[1:])
-        return result
-
-# ------------------------------------------------------------------------------- #
-
-# If alpha has the form P -> Q, then:
-  # Return CONVERT(~P v Q)
-def removeIMPLIES(wff):
-    if type(wff) is str:
-        return wff
-    elif type(wff) is list and wff[0] == "if":
-        return(["or",
-                ["not",
-                 removeIMPLIES(wff[1])],
-                removeIMPLIES(wff[2])])
-    else:
-        return([wff[0]] + [removeIMPLIES(i) for i in wff[1:]])
-
-# ------------------------------------------------------------------------------- #
-
-def doubleNegationElimination(wff):
-    if type(wff) is str:
-        return wff
-    elif type(wff) is list and wff[0] == "not" and type(wff[1]) is list and wff[1][0] == "not":
-        return(doubleNegationElimination(wff[1][1]))
-    else:
-        return([wff[0]] + [doubleNegationElimination(i) for i in wff[1:]])
-
-# ------------------------------------------------------------------------------- #
-
-def check_demorgan(wff):
-    parsed_wff = demorgan(wff)
-    if parsed_wff == wff:
-        # No more ops possible
-        return wff
-    else:
-        # For inner clauses
-        return check_demorgan(parsed_wff)
- 
-# If alpha has the form ~(~P), then return CONVERT(P)   
-def demorgan(wff):
-    if type(wff) is str:
-        return wff
-    elif type(wff) is list and wff[0] == "not" and type(wff[1]) is list and wff[1][0] == "and":
-        # If alpha has the form ~(P ^ Q), then return CONVERT(~P v ~Q)
-        return(["or"] + [check_demorgan(["not", i]) for i in wff[1][1:]])
-    elif type(wff) is list and wff[0] == "not" and type(wff[1]) is list and wff[1][0] == "or":
-        # If alpha has the form ~(P v Q), then return CONVERT(~P ^ ~Q)
-        return(["and"] + [check_demorgan(["not", i]) for i in wff[1][1:]])
-    else:
-        return ([wff[0]] + [check_demorgan(i) for i in wff[1:]])
-
-# ------------------------------------------------------------------------------- #
-
-# if alpha has the form (and,P,Q,R) then return (and,(and,P,Q),R)
-# if alpha has the form (or,P,Q,R) then return (or,(or,P,Q),R)
-def binaryize(wff): # ensures all connectives are binary (and / or)
-    result = [];
-    if type(wff) is str:
-        return wff
-    elif type(wff) is list and wff[0] == "and" and len(wff) > 3: # too long
-        result.append("and");
-        result.append(wff[1]);
-        result.append(binaryize(["and"] + wff[2:]));
-        # return(["and", wff[1], binaryize(["and"] + wff[2:])])
-        return result;
-    elif type(wff) is list and wff[0] == "or" and len(wff) > 3:
-     # too long
-        result.append("or");
-        result.append(wff[1]);
-        result.append(binaryize(["or"] + wff[2:]));
-        # return(["or", wff[1], binaryize(["or"] + wff[2:])])
-        return result;
-    else:
-        return([wff[0]] + [binaryize(i) for i in wff[1:]])
-    
-# ------------------------------------------------------------------------------- #
-
-# if alpha has the form (and,(or,P,Q),R) then return (or,(and,P,R),(and,Q,R))
-def check_distributivity(wff):
-    parsed_wff = distribute(wff)
-    if parsed_wff == wff: 
-        # No fuurther distribution possible
-        return wff
-    else:
-        # Distribute inner clauses
-        return check_distributivity(parsed_wff)
-    
-
-def distribute(wff): # only works on binary connectives
-    if type(wff) is str:
-        return wff
-    elif type(wff) is list and wff[0] == "and" and type(wff[1]) is list and wff[1][0] == "or":
-        # distribute wff[2] over wff[1]
-        return(["or"] + [check_distributivity(["and", i, wff[2]]) for i in wff[1][1:]])
-    elif type(wff) is list and wff[0] == "and" and type(wff[2]) is list and wff[2][0] == "or":
-        # distribute wff[1] over wff[2]
-        return(["or"] + [check_distributivity(["and", i, wff[1]]) for i in wff[2][1:]])
-    else:
-        return ([wff[0]] + [check_distributivity(i) for i in wff[1:]])
+# Hash-consed formulas: each distinct subformula is stored once and referred to
+# by its index. An atom is stored as its name and anything else as a tuple
+# (op, argument indices...), so identical subformulas get the same index and a
+# transformation memoized by index handles each of them once.
+class FormulaTable:
+    def __init__(self):
+        self.nodes = [] # index -> atom name or (op, argument indices...)
+        self.index = {} # the reverse
+
+    def node(self, key):
+        i = self.index.get(key)
+        if i is None:
+            i = len(self.nodes)
+            self.nodes.append(key)
+            self.index[key] = i
+        return i
+
+    # interns a nested-list wff and returns the index of its root; a list
+    # object that occurs several times in wff is only walked once
+    def intern(self, wff):
+        seen = {} # id of a list already interned -> its index
+        done = []
+        stack = [(wff, False)]
+        while stack:
+            w, expanded = stack.pop()
+            if type(w) is str:
+                done.append(self.node(w))
+            elif id(w) in seen:
+                done.append(seen[id(w)])
+            elif not expanded:
+                stack.append((w, True))
+                for i in reversed(w[1:]):
+                    stack.append((i, False))
+            else:
+                n = len(w) - 1
+                args = tuple(done[len(done) - n:])
+                del done[len(done) - n:]
+                seen[id(w)] = self.node((w[0],) + args)
+                done.append(seen[id(w)])
+        return done[0]
 
 # ------------------------------------------------------------------------------- #
 
-def check_orAssociativity(wff):
-    parsed_wff = orAssociativity(wff)
-    if parsed_wff == wff:
-        # No more ops possible
-        return wff
-    else:
-        # For inner clauses
-        return check_orAssociativity(parsed_wff)
-
-# Opposite of Binaryize 
-def orAssociativity(wff):
-    if type(wff) is str:
-        return wff
-    elif type(wff) is list and wff[0] == "or":
-        result = ["or"]
-        # iterate through disjuncts looking for "or" lists
-        for i in wff[1:]:
-            if type(i) is list and i[0] == "or":
-                result = result + i[1:]
+# Rewrites the wff into a list of terms, each a list of literals, in one
+# bottom-up pass over an explicit stack. Negations are pushed down on the way
+# in ("if" and "iff" expanded, De Morgan applied, double negations dropped) and
+# on the way out "or" joins the term lists of its arguments while "and"
+# distributes over them, so the result comes out flat. Chains of the same
+# operator are flattened on the way in, so that each "or" copies its terms
+# once rather than once per level. Subformulas are interned first, and those
+# used more than once are rewritten once per polarity and remembered; the rest
+# are forgotten as soon as their parent has used them.
+def normalize(wff):
+    table = FormulaTable()
+    nodes = table.nodes
+    root = table.intern(wff)
+    shared = sharedNodes(nodes)
+    memo = {} # (index, negated) -> term list, for shared subformulas only
+    done = [] # term lists of the finished subformulas, in order
+    stack = [(root, False, None, 0)] # (subformula, negated, its operator and arity once the arguments are pushed)
+    while stack:
+        i, negated, op, n = stack.pop()
+        w = nodes[i]
+        if op is None and (i, negated) in memo:
+            done.append(memo[(i, negated)])
+        elif type(w) is str:
+            done.append([[["not", w] if negated else w]])
+        elif w[0] == "not":
+            stack.append((w[1], not negated, None, 0))
+        elif op is None:
+            op, children = split(w, negated)
+            if op != "iff":
+                children = operands(nodes, shared, op, children)
+            stack.append((i, negated, op, len(children)))
+            for child in reversed(children):
+                stack.append(child + (None, 0))
+        else:
+            args = done[len(done) - n:]
+            del done[len(done) - n:]
+            if op == "iff":
+                p, not_p, q, not_q = args
+                if negated:
+                    # ~(P <-> Q) is (P ^ ~Q) v (~P ^ Q)
+                    done.append(disjunction([conjunction([p, not_q]), conjunction([not_p, q])]))
+                else:
+                    # P <-> Q is (P ^ Q) v (~P ^ ~Q)
+                    done.append(disjunction([conjunction([p, q]), conjunction([not_p, not_q])]))
+            elif op == "and":
+                done.append(conjunction(args))
             else:
-                result.append(i)
-        return result
-    else:
-        return([wff[0]] + [orAssociativity(i) for i in wff[1:]])
+                done.append(disjunction(args))
+            if shared[i]:
+                memo[(i, negated)] = done[-1]
+    return done[0]
+
+# whether each interned subformula is used more than once; "iff" uses both of
+# its arguments twice, once per polarity
+def sharedNodes(nodes):
+    uses = [0] * len(nodes)
+    for w in nodes:
+        if type(w) is tuple:
+            for a in w[1:]:
+                uses[a] += 2 if w[0] == "iff" else 1
+    return [u > 1 for u in uses]
+
+# the operator a subformula amounts to once the negation is pushed in, and its
+# arguments as (index, negated) pairs; "iff" takes both polarities of both
+def split(w, negated):
+    if w[0] == "iff":
+        return "iff", [(w[1], False), (w[1], True), (w[2], False), (w[2], True)]
+    if w[0] == "if":
+        # P -> Q is ~P v Q, and ~(P -> Q) is P ^ ~Q
+        return ("and" if negated else "or"), [(w[1], not negated), (w[2], negated)]
+    return (w[0] if not negated else {"and": "or", "or": "and"}[w[0]]), [(a, negated) for a in w[1:]]
+
+# the arguments of an op ("and" or "or") node, with every argument that is the
+# same op and used nowhere else replaced by its own arguments, in order
+def operands(nodes, shared, op, children):
+    flat = []
+    todo = children[::-1]
+    while todo:
+        i, negated = todo.pop()
+        while type(nodes[i]) is tuple and nodes[i][0] == "not" and not shared[i]:
+            i, negated = nodes[i][1], not negated
+        w = nodes[i]
+        if type(w) is tuple and w[0] in ("and", "or", "if") and not shared[i]:
+            inner, args = split(w, negated)
+            if inner == op:
+                todo.extend(args[::-1])
+                continue
+        flat.append((i, negated))
+    return flat
+
+# if alpha has the form (and,(or,P,Q),R) then return (or,(and,P,R),(and,Q,R));
+# the terms being built are new lists, so a single term is added in place
+def conjunction(args):
+    result = [[]]
+    for a in args:
+        if len(a) == 1:
+            for r in result:
+                r.extend(a[0])
+        else:
+            result = [r + t for r in result for t in a]
+    return result
 
-# ------------------------------------------------------------------------------- #
+# the terms of P v Q v ... are all the terms of P, Q, ...
+def disjunction(args):
+    return [t for a in args for t in a]
 
-def check_andAssociativity(wff):
-    parsed_wff = andAssociativity(wff)
-    if parsed_wff == wff:
-        # No more ops possible
-        return wff
-    else:
-        # For inner clauses
-        return check_andAssociativity(parsed_wff)
+# ------------------------------------------------------------------------------- #
 
-# Opposite of Binaryize     
-def andAssociativity(wff):
-    if type(wff) is str:
-        return wff
-    elif type(wff) is list and wff[0] == "and":
-        result = ["and"]
-        # iterate through conjuncts looking for "and" lists
-        for i in wff[1:]:
-            if type(i) is list and i[0] == "and":
-                result = result + i[1:]
-            else:
-                result.append(i)
-        return result
-    else:
-        return([wff[0]] + [andAssociativity(i) for i in wff[1:]])
+# Yields the terms of the DNF one at a time, as ["and", literals...] in the
+# order dnf() lists them, without building the whole disjunction: a search for
+# one consistent term can stop as soon as it sees one. Each state on the stack
+# is a term under construction together with the subformulas it still has to
+# satisfy, both as linked lists (head, tail) shared between states; an "or"
+# (after pushing negations down) splits a state into one per disjunct.
+def iterTerms(wff):
+    table = FormulaTable()
+    nodes = table.nodes
+    stack = [(((table.intern(wff), False), None), None)] # (goals, literals in reverse)
+    while stack:
+        goals, literals = stack.pop()
+        if goals is None:
+            reached = []
+            while literals is not None:
+                reached.append(literals[0])
+                literals = literals[1]
+            term = ["and"]
+            seen = set()
+            for l in reversed(reached):
+                if literalKey(l) not in seen:
+                    seen.add(literalKey(l))
+                    term.append(l)
+            yield term
+            continue
+        (i, negated), goals = goals
+        w = nodes[i]
+        if type(w) is str:
+            stack.append((goals, (["not", w] if negated else w, literals)))
+            continue
+        if w[0] == "not":
+            branches = [[(w[1], not negated)]]
+        elif w[0] == "iff":
+            # P <-> Q is (P ^ Q) v (~P ^ ~Q), and ~(P <-> Q) is (P ^ ~Q) v (~P ^ Q)
+            branches = [[(w[1], False), (w[2], negated)], [(w[1], True), (w[2], not negated)]]
+        elif w[0] == "if":
+            # P -> Q is ~P v Q, and ~(P -> Q) is P ^ ~Q
+            branches = [[(w[1], False), (w[2], True)]] if negated else [[(w[1], True)], [(w[2], False)]]
+        elif (w[0] == "and") != negated:
+            branches = [[(a, negated) for a in w[1:]]]
+        else:
+            branches = [[(a, negated)] for a in w[1:]]
+        for branch in reversed(branches):
+            rest = goals
+            for goal in reversed(branch):
+                rest = (goal, rest)
+            stack.append((rest, literals))
 
 # ------------------------------------------------------------------------------- #
 
@@ -196,12 +230,14 @@ def removeDuplicateLiterals(wff):
     if wff[0] == "or":
         return(["or"] + [removeDuplicateLiterals(i) for i in wff[1:]])
     if wff[0] == "and":
+        seen = set()
         remains = []
         for l in wff[1:]:
-            if l not in remains:
+            if literalKey(l) not in seen:
+                seen.add(literalKey(l))
                 remains.append(l)
         if len(remains) == 1:
-            return remainwff[0]
+            return remains[0]
         else:
             return(["and"] + remains)
 
@@ -213,27 +249,39 @@ def removeDuplicateClauses(wff):
     if wff[0] == "not":
         return wff
     if wff[0] == "and":
+        if contradictory(clauseKey(wff)):
+            return ["or"]
         return wff
     if wff[0] == "or": #disjunction of clauses
+        seen = set()
         remains = []
         for c in wff[1:]:
-            if unique(c, remains):
+            key = clauseKey(c)
+            if key not in seen and not contradictory(key):
+                seen.add(key)
                 remains.append(c)
         if len(remains) == 1:
-            return remainwff[0]
+            return remains[0]
         else:
             return(["or"] + remains)
 
-# check for unique clauses
-def unique(c, remains):
-    for p in remains:
-        if type(c) is str or type(p) is str:
-            if c == p:
-                return False
-        elif len(c) == len(p):
-            if len([i for i in c[1:] if i not in p[1:]]) == 0:
-                return False
-    return True
+# a literal as a hashable (name, positive) pair
+def literalKey(l):
+    if type(l) is str:
+        return (l, True)
+    else:
+        return (l[1], False)
+
+# a clause as a set of literal keys, so that clauses equal up to order and
+# repetition hash alike
+def clauseKey(c):
+    if type(c) is str or c[0] == "not":
+        return frozenset([literalKey(c)])
+    return frozenset(literalKey(l) for l in c[1:])
+
+# a clause with both p and ~p can never be true
+def contradictory(key):
+    return any((name, False) in key for name, positive in key if positive)
 
 # ------------------------------------------------------------------------------- #     
 
@@ -259,14 +307,10 @@ def parseOutput(dnf):
 # ------------------------------------------------------------------------------- #
 
 def dnf(wff):
-    wff = removeIFF(wff)
-    wff = removeIMPLIES(wff)
-    wff = check_demorgan(wff)
-    wff = doubleNegationElimination(wff)
-    wff = binaryize(wff)
-    wff = check_distributivity(wff)
-    wff = check_orAssociativity(wff)
-    wff = check_andAssociativity(wff)
+    terms = normalize(wff)
+    wff = ["or"] + [["and"] + t if len(t) > 1 else t[0] for t in terms]
+    if len(terms) == 1:
+        wff = wff[1]
     wff = removeDuplicateLiterals(wff)
     wff = removeDuplicateClauses(wff)
     wff = parseOutput(wff)
@@ -275,12 +319,20 @@ def dnf(wff):
 
 # ------------------------------------------------------------------------------- #
 
+# one formula of a batch, as typed at the prompt
+def batchDNF(wff):
+    return dnf(parseInput(wff))
+
+# ------------------------------------------------------------------------------- #
+
 if __name__ == "__main__":
-    print("Enter a WFF:")
-    wff = input()
-    print("Output in DNF:")
-    print repr(dnf(parseInput(wff)))
-    # sentences = fileinput.input()
-    # for l in sentences:
-    #     wff = parseInput(eval(l.strip()))
-    #     print repr(dnf(wff))
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Convert WFFs to DNF.")
+    addBatchArguments(parser)
+    args = parser.parse_args()
+    if args.batch is not None:
+        runBatch(batchDNF, args.batch, args.workers)
+    else:
+        print("Enter a WFF:")
+        wff = input()
+        print("Output in DNF:")
+        print repr(dnf(parseInput(wff)))
\ No newline at end of file
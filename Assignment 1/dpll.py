@@ -1,103 +1,183 @@
 import sys
+import argparse
 import fileinput
 
-# ------------------------------------------------------------------------------- #
-
-# at least one member of model in each clause
-def allClausesTrue(cnf, model): 
-    for clause in cnf[1:]: # skip the "and"
-        if len([var for var in clause[1:] if var in model]) == 0:
-            return False
-    return True
+from batch import addBatchArguments, runBatch
+from convert2CNF import parseInput, projectModel, tseitin
+from symbols import SymbolTable, loadSolver
 
 # ------------------------------------------------------------------------------- #
 
-# returns the compliment of each model literal
-def complement_model(model): 
-    comp_literals = []
-    for literal in model:
-        if type(literal) is str:
-            comp_literals.append(["not", literal])
-        else:
-            comp_literals.append(literal[1])
-    return comp_literals
-
-# ------------------------------------------------------------------------------- #
-
-# some clause cannot be satisfied
-def someClausesFalse(cnf, model): 
-    modelCompliments = complement_model(model)
-    for clause in cnf[1:]:
-        if len([var for var in clause[1:] if var not in modelCompliments]) == 0:
-            return True
-    return False
-
-# ------------------------------------------------------------------------------- #
-
-def pureLiteral(cnf, model): # finds 1 pure literal not already in model
-    modelCompliments = complement_model(model)
-    candidates = []
-    for clause in cnf[1:]:
-        if len([var for var in clause[1:] if var in model]) == 0:
-            # clause not yet satisfied by model
-            candidates = candidates + [var for var in clause[1:]]
-    candidateCompliments = complement_model(candidates)
-    pure = [var for var in candidates if var not in candidateCompliments]
-    for var in pure:
-        if var not in model and var not in modelCompliments:
-            return var
-    return False
-
-# ------------------------------------------------------------------------------- #
-
-def unitClause(cnf, model): # finds 1 literal not in model appearing by itself in a clause
-    modelCompliments = complement_model(model)
-    for clause in cnf[1:]:
-        remaining = [var for var in clause[1:] if var not in modelCompliments]
-        if len(remaining) == 1:
-            if remaining[0] not in model:
-                return remaining[0]
-    return False
-
-# ------------------------------------------------------------------------------- #
+# Iterative DPLL over one shared trail of assignments, on int clauses from a
+# SymbolTable. Every clause keeps a count of its true and of its unassigned
+# literals, and every literal a count of the unsatisfied clauses it occurs in,
+# so a false clause, a unit clause, a pure literal or a satisfied formula shows
+# up as soon as the assignment causing it is made, without rescanning the
+# clauses. Decisions are undone chronologically: a conflict flips the latest
+# decision that has not been tried both ways.
+class DPLL:
+    def __init__(self, clauses, nvars):
+        self.pos = [[] for _ in range(nvars + 1)] # clauses containing each variable positively
+        self.neg = [[] for _ in range(nvars + 1)] # negatively
+        self.value = [0] * (nvars + 1) # 1, -1, or 0 while unassigned
+        self.count = {} # literal -> number of unsatisfied clauses containing it
+        for var in range(1, nvars + 1):
+            self.count[var] = 0
+            self.count[-var] = 0
+        self.clauses = []
+        for clause in clauses:
+            literals = []
+            seen = set()
+            for lit in clause:
+                if lit not in seen:
+                    seen.add(lit)
+                    literals.append(lit)
+            for lit in literals:
+                self.occurs(lit).append(len(self.clauses))
+                self.count[lit] += 1
+            self.clauses.append(literals)
+        self.true = [0] * len(self.clauses) # true literals of each clause
+        self.unassigned = [len(c) for c in self.clauses] # unassigned literals of each clause
+        self.unsatisfied = len(self.clauses) # clauses without a true literal
+        self.conflict = [] in self.clauses # whether some clause is false
+        self.trail = [] # assigned literals, in order
+        self.decisions = [] # (trail position, literal, whether it is the second try) of each decision
+        self.next = 1 # no variable below this one is unassigned
+        self.units = [c for c in range(len(self.clauses)) if len(self.clauses[c]) == 1] # clauses that may be unit
+        self.pure = [lit for lit in self.count if self.count[lit] and not self.count[-lit]] # literals that may be pure
+
+    def occurs(self, lit):
+        return self.pos[lit] if lit > 0 else self.neg[-lit]
+
+    # ------------------------------------------------------------------------------- #
+
+    def assign(self, lit):
+        self.value[abs(lit)] = 1 if lit > 0 else -1
+        self.trail.append(lit)
+        count = self.count
+        for c in self.occurs(lit):
+            self.unassigned[c] -= 1
+            self.true[c] += 1
+            if self.true[c] == 1:
+                self.unsatisfied -= 1
+                for l in self.clauses[c]:
+                    count[l] -= 1
+                    if count[l] == 0 and count[-l]:
+                        self.pure.append(-l)
+        for c in self.occurs(-lit):
+            self.unassigned[c] -= 1
+            if self.true[c] == 0:
+                if self.unassigned[c] == 0:
+                    self.conflict = True
+                elif self.unassigned[c] == 1:
+                    self.units.append(c)
+
+    # undoes the last assignment on the trail
+    def unassign(self):
+        lit = self.trail.pop()
+        var = abs(lit)
+        self.value[var] = 0
+        self.next = min(self.next, var)
+        count = self.count
+        for c in self.occurs(lit):
+            self.unassigned[c] += 1
+            self.true[c] -= 1
+            if self.true[c] == 0:
+                self.unsatisfied += 1
+                for l in self.clauses[c]:
+                    count[l] += 1
+                    if count[l] == 1 and not count[-l]:
+                        self.pure.append(l)
+        for c in self.occurs(-lit):
+            self.unassigned[c] += 1
+        if count[var] and not count[-var]:
+            self.pure.append(var)
+        elif count[-var] and not count[var]:
+            self.pure.append(-var)
+
+    # undoes the trail up to the latest decision tried one way only and tries the
+    # other way; False if there is none
+    def backtrack(self):
+        while self.decisions:
+            position, lit, second = self.decisions.pop()
+            while len(self.trail) > position:
+                self.unassign()
+            if not second:
+                # the state before the decision had no unit clauses left
+                self.conflict = False
+                self.units = []
+                self.decisions.append((position, -lit, True))
+                self.assign(-lit)
+                return True
+        return False
 
-def pickSymbol(cnf, model): # finds a positive literal not in model or model compliments
-    symbols = model + complement_model(model)
-    for clause in cnf[1:]:
-        for literal in clause[1:]:
-            if type(literal) is str and literal not in symbols:
-                return literal
-    return False
+    # ------------------------------------------------------------------------------- #
+
+    # an unassigned literal that occurs in unsatisfied clauses only one way, or 0
+    def pureLiteral(self):
+        while self.pure:
+            lit = self.pure.pop()
+            if self.value[abs(lit)] == 0 and self.count[lit] and not self.count[-lit]:
+                return lit
+        return 0
+
+    # the unassigned literal of an unsatisfied clause with only one, or 0
+    def unitLiteral(self):
+        while self.units:
+            c = self.units.pop()
+            if self.true[c] == 0 and self.unassigned[c] == 1:
+                for lit in self.clauses[c]:
+                    if self.value[abs(lit)] == 0:
+                        return lit
+        return 0
+
+    # the first unassigned variable
+    def pickSymbol(self):
+        while self.value[self.next]:
+            self.next += 1
+        return self.next
+
+    # ------------------------------------------------------------------------------- #
+
+    # returns the assigned literals, starting with model, if the clauses are
+    # satisfiable with model and False otherwise
+    def solve(self, model):
+        for lit in model:
+            if self.value[abs(lit)] == 0:
+                self.assign(lit)
+            elif self.value[abs(lit)] != (1 if lit > 0 else -1):
+                return False
+        while True:
+            if self.conflict:
+                if not self.backtrack():
+                    return False
+            elif self.unsatisfied == 0:
+                return self.trail
+            else:
+                lit = self.pureLiteral() or self.unitLiteral()
+                if not lit:
+                    lit = self.pickSymbol()
+                    self.decisions.append((len(self.trail), lit, False))
+                self.assign(lit)
 
 # ------------------------------------------------------------------------------- #
 
-def dpll(cnf, model):
-    if [] in cnf: 
-        # Empty Clause
-        return False
-    if allClausesTrue(cnf, model):
-        return model
-    if someClausesFalse(cnf, model):
-        return False
-    pure = pureLiteral(cnf, model)
-    if pure:
-        return dpll(cnf, model + [pure])
-    unit = unitClause(cnf, model)
-    if unit:
-        return dpll(cnf, model + [unit])
-    pick = pickSymbol(cnf, model)
-    if pick:
-        # try positive
-        result = dpll(cnf, model + [pick])
-        if result:
-            return result
-        else:
-            # try negative
-            result = dpll(cnf, model + [['not', pick]])
-            if result:
-                return result
-            else:
-                return False
+# Symbols are turned into ints on the way in and back on the way out. solver is
+# "dpll" for the search above or "cdcl" for the top-level Solver, which takes the
+# same int clauses and model as assumptions, and gives back every variable.
+def dpll(cnf, model, solver="dpll"):
+    table = SymbolTable()
+    clauses = table.clauses(cnf[1:])
+    model = [table.literal(l) for l in model]
+    if solver != "cdcl":
+        result = DPLL(clauses, len(table)).solve(model)
+    elif [] in clauses:
+        # the Solver takes no empty clauses
+        result = False
+    else:
+        cdcl = loadSolver()(clauses, "VSIDS")
+        result = cdcl.get_model() if cdcl.solve(model) == "SATISFIABLE" else False
+    return result if result is False else table.symbols(result)
 
 # ------------------------------------------------------------------------------- #
 
@@ -112,12 +192,32 @@ def formatOutput(result):
             else:
                 mod.append(v[1] + "=false")
         return mod
-            
+
+# ------------------------------------------------------------------------------- #
+
+# one formula of a batch: a CNF, or with convert any WFF as typed at the prompt,
+# which goes through the Tseitin encoding and has its fresh variables dropped
+# from the model
+def batchDPLL(formula, solver, convert):
+    if convert:
+        cnf, fresh = tseitin(parseInput(formula))
+        return formatOutput(projectModel(dpll(cnf, [], solver), fresh))
+    return formatOutput(dpll(formula, [], solver))
+
 # ------------------------------------------------------------------------------- #
 
 if __name__ == "__main__":
 
-    print("Enter a WFF in CNF:")
-    sentence = input()
-    print("Output:")
-    print repr(formatOutput(dpll(sentence,[])))
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Check CNF formulas for satisfiability.")
+    parser.add_argument("solver", nargs="?", default="dpll", choices=["dpll", "cdcl"])
+    parser.add_argument("--convert", action="store_true",
+                        help="take any WFF, converting it to CNF first")
+    addBatchArguments(parser)
+    args = parser.parse_args()
+    if args.batch is not None:
+        runBatch(batchDPLL, args.batch, args.workers, (args.solver, args.convert))
+    else:
+        print("Enter a WFF in CNF:" if not args.convert else "Enter a WFF:")
+        sentence = input()
+        print("Output:")
+        print repr(batchDPLL(sentence, args.solver, args.convert))
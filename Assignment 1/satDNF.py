@@ -1,31 +1,93 @@
 import sys
+import argparse
 import fileinput
 
+from batch import addBatchArguments, runBatch
+from convert2DNF import iterTerms, parseInput
+from symbols import SymbolTable
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
 # ------------------------------------------------------------------------------- #
 
+# some variable occurs both positively and negatively in the clause; the names
+# are hashed once each, which is as cheap as numbering them would be
 def complementingLiteralsPresent(clause):
-	unique = []
+	positive = set()
+	negative = set()
 	for literal in clause[1:]:
-		if type(literal) is str and literal in unique:
-			return True
-		if type(literal) is str and literal not in unique:
-			unique.append(literal)
-		if type(literal) is list and literal[1] in unique:
-			return True
-		if type(literal) is list and literal[1] not in unique:
-			unique.append(literal[1])
+		if type(literal) is str:
+			if literal in negative:
+				return True
+			positive.add(literal)
+		else:
+			if literal[1] in positive:
+				return True
+			negative.add(literal[1])
 	return False
 
+# Batch mode for large DNFs. encodeClauses() turns a list of clauses into a
+# NumPy matrix with one row per clause: their int literals from table (a new
+# SymbolTable by default), padded with 0. The literals of all the clauses are
+# numbered in one pass and dropped into place with a single masked assignment.
+# consistentClauses() then checks every row at once: with each row sorted by
+# variable, complementing literals end up next to each other. Returns a boolean
+# array, true for the clauses without complementing literals.
+# Only the check is fast: encoding still looks at every literal in Python, so
+# for nested-list clauses satDNF(batch=True) is no faster than the plain loop,
+# which stops at the first complementing pair of each clause and at the first
+# consistent clause. consistentClauses() is meant for matrices that are already
+# encoded, for instance ones that are checked again and again.
+def encodeClauses(clauses, table=None):
+	if numpy is None:
+		raise ImportError('The batch mode of satDNF needs NumPy')
+	if table is None:
+		table = SymbolTable()
+	index = table.index # table.literal() only for symbols it has not numbered yet
+	lengths = numpy.fromiter((len(clause) - 1 for clause in clauses), numpy.int64, len(clauses))
+	literals = numpy.array([index.get(l) or table.literal(l) if type(l) is str else -(index.get(l[1]) or -table.literal(l))
+		for clause in clauses for l in clause[1:]], dtype=numpy.int64)
+	width = max(int(lengths.max()) if len(clauses) else 0, 1)
+	matrix = numpy.zeros((len(clauses), width), dtype=numpy.int64)
+	matrix[numpy.arange(width) < lengths[:, None]] = literals
+	return matrix
+
+def consistentClauses(matrix):
+	if numpy is None:
+		raise ImportError('The batch mode of satDNF needs NumPy')
+	order = numpy.argsort(numpy.abs(matrix), axis=1, kind='stable')
+	literals = numpy.take_along_axis(matrix, order, axis=1)
+	variables = numpy.abs(literals)
+	complementing = (variables[:, 1:] == variables[:, :-1]) & (literals[:, 1:] != literals[:, :-1])
+	return ~complementing.any(axis=1)
+
 # ------------------------------------------------------------------------------- #
 
-def satDNF(dnf):
-	for clause in dnf[1:]:
+# dnf is either ["or", clauses...] or any iterable of clauses, such as iterTerms();
+# with batch=True all the clauses are encoded and checked by consistentClauses(),
+# which gives the same answer but is not a faster way to get it (see above)
+def satDNF(dnf, batch=False):
+	if type(dnf) is list:
+		dnf = dnf[1:]
+	if batch:
+		dnf = list(dnf)
+		consistent = consistentClauses(encodeClauses(dnf))
+		return dnf[consistent.argmax()] if consistent.any() else False
+	for clause in dnf:
 		if(complementingLiteralsPresent(clause)):
 			continue
 		else:
 			return clause
 	return False
 
+# any wff, without converting all of it to DNF: the terms are generated lazily
+# and the first one without complementing literals ends the search
+def satWFF(wff):
+	return satDNF(iterTerms(wff))
+
 # ------------------------------------------------------------------------------- #
 
 def formatOutput(result):
@@ -42,9 +104,25 @@ def formatOutput(result):
 
 # ------------------------------------------------------------------------------- #
 
+# one formula of a batch: a DNF, or with convert any WFF as typed at the prompt
+def batchSatDNF(formula, convert):
+	if convert:
+		return formatOutput(satWFF(parseInput(formula)))
+	return formatOutput(satDNF(formula))
+
+# ------------------------------------------------------------------------------- #
+
 if __name__ == "__main__":
 
-	print("Enter a WFF in DNF:")
-	sentence = input()
-	print("Output:")
-	print repr(formatOutput(satDNF(sentence)))
\ No newline at end of file
+	parser = argparse.ArgumentParser(description="Check DNF formulas for satisfiability.")
+	parser.add_argument("--convert", action="store_true",
+	                    help="take any WFF, converting it to DNF lazily")
+	addBatchArguments(parser)
+	args = parser.parse_args()
+	if args.batch is not None:
+		runBatch(batchSatDNF, args.batch, args.workers, (args.convert,))
+	else:
+		print("Enter a WFF in DNF:" if not args.convert else "Enter a WFF:")
+		sentence = input()
+		print("Output:")
+		print repr(batchSatDNF(sentence, args.convert))
\ No newline at end of file
@@ -0,0 +1,59 @@
+import os
+import sys
+import imp
+
+# ------------------------------------------------------------------------------- #
+
+# Symbols of the nested-list formula format, numbered 1, 2, ... in order of
+# first appearance. A literal goes in as a symbol or ["not", symbol] and comes
+# out as a signed int, the DIMACS encoding the top-level Solver uses, so that
+# solving and checking only ever compare ints; symbols are restored for output.
+class SymbolTable:
+    def __init__(self):
+        self.names = [None] # variable -> symbol
+        self.index = {} # symbol -> variable
+
+    # number of variables
+    def __len__(self):
+        return len(self.names) - 1
+
+    # the int literal of a symbol or ["not", symbol], numbering new symbols
+    def literal(self, l):
+        negated = type(l) is not str
+        name = l[1] if negated else l
+        var = self.index.get(name)
+        if var is None:
+            var = len(self.names)
+            self.index[name] = var
+            self.names.append(name)
+        return -var if negated else var
+
+    # the symbol or ["not", symbol] of an int literal
+    def symbol(self, lit):
+        return self.names[lit] if lit > 0 else ["not", self.names[-lit]]
+
+    # the int literals of a clause ["or", literals...] or term ["and", literals...]
+    def clause(self, clause):
+        return [self.literal(l) for l in clause[1:]]
+
+    # the int clauses of the clauses of a CNF (or the terms of a DNF)
+    def clauses(self, clauses):
+        return [self.clause(c) for c in clauses]
+
+    # the symbols of a list of int literals
+    def symbols(self, lits):
+        return [self.symbol(lit) for lit in lits]
+
+# ------------------------------------------------------------------------------- #
+
+# The CDCL Solver of the top-level dpll.py, for int clauses from a SymbolTable.
+# That module has the same name as dpll.py here, so it is loaded from its path,
+# once, as "cdcl"; its own imports, such as simplify, are found next to it.
+def loadSolver():
+    module = sys.modules.get("cdcl")
+    if module is None:
+        top = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        if top not in sys.path:
+            sys.path.append(top)
+        module = imp.load_source("cdcl", os.path.join(top, "dpll.py"))
+    return module.Solver
@@ -0,0 +1,83 @@
+'''
+    Benchmark for the CDCL Solver in dpll.py
+
+    Run using "python benchmark.py [file.cnf ...]"
+
+    With no files, random 3-SAT instances of increasing size are generated
+    and written out in DIMACS format before being solved, so that the same
+    inputs can be fed to other solvers for comparison.
+'''
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from dpll import Solver, parseDIMACS
+
+#-----------------------------------------------------------------
+
+def random_ksat(no_of_vars, no_of_clauses, k=3, seed=0):
+    '''
+        Generates a random k-SAT instance as a list of DIMACS clauses.
+    '''
+    rng = random.Random(seed)
+    variables = range(1, no_of_vars + 1)
+    return [[v if rng.random() < 0.5 else -v for v in rng.sample(variables, k)]
+            for _ in range(no_of_clauses)]
+
+def write_dimacs(clauses, no_of_vars, path):
+    '''
+        Writes the clauses to path in DIMACS CNF format.
+    '''
+    with open(path, 'w') as f:
+        f.write('p cnf %d %d\n' % (no_of_vars, len(clauses)))
+        for clause in clauses:
+            f.write(' '.join(str(l) for l in clause) + ' 0\n')
+
+#-----------------------------------------------------------------
+
+def run(path, heuristic, restart, simplify=False):
+    '''
+        Times Solver setup (including parsing) and solve on one DIMACS file.
+    '''
+    start = time.time()
+    solver = Solver(parseDIMACS(path), heuristic, restart, simplify=simplify)
+    setup = time.time() - start
+    no_of_clauses = len(solver.clauses)
+    start = time.time()
+    result = solver.solve()
+    solve = time.time() - start
+    print('%-32s %8d %8d  %-14s setup %8.3fs  solve %8.3fs  %9d conflicts  %9d decisions  %9.0f decisions/s' % (
+        os.path.basename(path), solver.nvars, no_of_clauses, result, setup, solve,
+        solver.conflicts, solver.decisions, solver.decisions / max(solve, 1e-9)))
+
+#-----------------------------------------------------------------
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Time the CDCL Solver on DIMACS inputs.')
+    parser.add_argument('files', nargs='*', help='DIMACS .cnf files (default: generated 3-SAT)')
+    parser.add_argument('--heuristic', default='VSIDS', choices=['VSIDS', 'JW', 'JW2'])
+    parser.add_argument('--restart', default='luby', choices=['luby', 'geometric', 'glucose', 'none'])
+    parser.add_argument('--sizes', default='1000,10000,100000',
+                        help='variable counts of the generated instances')
+    parser.add_argument('--ratio', type=float, default=2.0,
+                        help='clause/variable ratio of the generated instances')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--simplify', action='store_true',
+                        help='simplify the clauses before search (counted in setup)')
+    args = parser.parse_args()
+
+    files = args.files
+    if not files:
+        tmp = tempfile.mkdtemp(prefix='dpll-bench-')
+        for n in [int(x) for x in args.sizes.split(',')]:
+            path = os.path.join(tmp, 'random3sat-%d.cnf' % n)
+            write_dimacs(random_ksat(n, int(n * args.ratio), seed=args.seed), n, path)
+            files.append(path)
+
+    print('%-32s %8s %8s' % ('instance', 'vars', 'clauses'))
+    for path in files:
+        run(path, args.heuristic, None if args.restart == 'none' else args.restart, args.simplify)
@@ -0,0 +1,248 @@
+'''
+    Cube-and-conquer for the CDCL Solver in dpll.py
+
+    Run using "python cube.py file.cnf" to split and solve on this machine.
+
+    To spread the cubes over several machines that share a directory:
+        python cube.py file.cnf --split DIR     (once, writes the cubes)
+        python cube.py file.cnf --work DIR      (on every node, any number of times)
+        python cube.py --collect DIR            (waits for and prints the answer)
+
+    A lookahead phase splits the search space on the variables the Solver
+    would decide first (VSIDS or JW), pruning branches that propagation
+    already refutes. Each remaining cube is solved as a set of assumptions.
+'''
+
+import argparse
+import math
+import multiprocessing
+import os
+import time
+import traceback
+
+try:
+    from queue import Empty
+except ImportError:
+    from Queue import Empty
+
+from dpll import Solver, parseDIMACS
+
+#-----------------------------------------------------------------
+
+def makeCubes(solver, depth):
+    '''
+        Splits on the depth best-scoring variables of solver, choosing each
+        one after propagating the ones above it. Returns the cubes (lists
+        of literals) whose propagation does not conflict, preferred
+        branches first; no cubes means the clauses are unsatisfiable.
+    '''
+    cubes = []
+    solver.cancel_until(0)
+    if not solver.ok or solver.unit_propagation() == 'CONFLICT':
+        solver.ok = False
+        return cubes
+
+    def split(cube):
+        if len(cube) == depth or not solver.has_unassigned_literals():
+            cubes.append(list(cube))
+            return
+        var = solver.pick_variable()
+        solver.order.insert(var)
+        first = solver.preferred_literal(var)
+        for lit in (first, -first):
+            solver.new_level()
+            solver.apply_literal(lit)
+            if solver.unit_propagation() != 'CONFLICT':
+                cube.append(lit)
+                split(cube)
+                cube.pop()
+            solver.cancel_until(len(cube))
+
+    split([])
+    return cubes
+
+def defaultDepth(processes):
+    '''
+        Enough splits for about 16 cubes per worker, so that workers that
+        finish early have something left to take.
+    '''
+    return int(math.ceil(math.log(processes * 16, 2)))
+
+#-----------------------------------------------------------------
+
+def cubeWorker(clauses, heuristic, cubes, results):
+    '''
+    Take cubes off the shared queue until it hands out None, solving each
+    as assumptions on one incremental Solver, and report (index, result,
+    model) for every cube; errors are reported as ('ERROR', traceback).
+    '''
+    try:
+        solver = Solver(clauses, heuristic)
+        while True:
+            item = cubes.get()
+            if item is None:
+                break
+            index, cube = item
+            result = solver.solve(cube)
+            model = solver.get_model() if result == 'SATISFIABLE' else None
+            results.put((index, result, model))
+    except Exception:
+        results.put((-1, 'ERROR', traceback.format_exc()))
+
+def solveCubes(clauses, processes=None, depth=None, heuristic='VSIDS'):
+    '''
+    Split clauses into cubes and solve them on a pool of processes.
+    Returns (result, model, cube): the first satisfiable cube ends the
+    search and the remaining workers are killed. model and cube are None
+    when the clauses are unsatisfiable.
+
+    Idle workers take the next cube from one shared queue, so a worker
+    stuck on a hard cube never holds up the easy ones behind it.
+    '''
+    clauses = [list(clause) for clause in clauses]
+    processes = processes or multiprocessing.cpu_count()
+    cubes = makeCubes(Solver(clauses, heuristic), depth or defaultDepth(processes))
+
+    queue = multiprocessing.Queue()
+    for item in enumerate(cubes):
+        queue.put(item)
+    for _ in range(processes):
+        queue.put(None)
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=cubeWorker, args=(clauses, heuristic, queue, results))
+               for _ in range(min(processes, len(cubes)))]
+    for worker in workers:
+        worker.daemon = True
+        worker.start()
+    try:
+        remaining = len(cubes)
+        while remaining:
+            try:
+                index, result, model = results.get(timeout=1)
+            except Empty:
+                # A worker killed from outside never reports back
+                if not any(worker.is_alive() for worker in workers) and results.empty():
+                    raise RuntimeError('cube workers exited with %d cubes left' % remaining)
+                continue
+            if result == 'ERROR':
+                raise RuntimeError('cube worker failed:\n' + model)
+            if result == 'SATISFIABLE':
+                return result, model, cubes[index]
+            remaining -= 1
+        return 'UNSATISFIABLE', None, None
+    finally:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.join()
+
+#-----------------------------------------------------------------
+# Directory queue for several nodes. Every cube is a file "cube-N";
+# a node claims one by renaming it to "cube-N.claimed", which only one
+# rename can do, and replaces the claim with "cube-N.sat" or "cube-N.unsat".
+# The first node to find a model also writes "SAT", which stops the others
+# before their next cube.
+
+def writeFile(path, text):
+    '''
+        Writes text to path through a temporary file, so readers on other
+        nodes never see half a file.
+    '''
+    tmp = '%s.tmp-%d' % (path, os.getpid())
+    with open(tmp, 'w') as f:
+        f.write(text)
+    os.rename(tmp, path)
+
+def writeCubes(cubes, directory):
+    '''
+        Writes each cube to its own file in directory, plus the count.
+    '''
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    for i, cube in enumerate(cubes):
+        writeFile(os.path.join(directory, 'cube-%d' % i), ' '.join(str(l) for l in cube) + ' 0\n')
+    writeFile(os.path.join(directory, 'count'), '%d\n' % len(cubes))
+
+def workDirectory(clauses, directory, heuristic='VSIDS'):
+    '''
+        Claims and solves cubes from directory until none are left or
+        some node has found a model. Returns the number of cubes solved.
+    '''
+    solver = Solver(clauses, heuristic)
+    solved = 0
+    while not os.path.exists(os.path.join(directory, 'SAT')):
+        names = [name for name in os.listdir(directory)
+                 if name.startswith('cube-') and name[5:].isdigit()]
+        if not names:
+            break
+        for name in sorted(names, key=lambda name: int(name[5:])):
+            path = os.path.join(directory, name)
+            try:
+                os.rename(path, path + '.claimed')
+            except OSError:
+                # Another node got there first
+                continue
+            with open(path + '.claimed') as f:
+                cube = [int(tok) for tok in f.read().split()[:-1]]
+            result = solver.solve(cube)
+            solved += 1
+            if result == 'SATISFIABLE':
+                model = ' '.join(str(l) for l in solver.get_model()) + ' 0\n'
+                writeFile(path + '.sat', model)
+                writeFile(os.path.join(directory, 'SAT'), model)
+            else:
+                writeFile(path + '.unsat', '')
+            os.remove(path + '.claimed')
+            break
+    return solved
+
+def collectCubes(directory, poll=1.0):
+    '''
+        Waits until directory holds a model or every cube is refuted and
+        returns (result, model). Cubes claimed by a node that died are
+        never answered, so a lost node has to be replaced by hand
+        (rename its "cube-N.claimed" files back to "cube-N").
+    '''
+    while True:
+        sat = os.path.join(directory, 'SAT')
+        if os.path.exists(sat):
+            with open(sat) as f:
+                return 'SATISFIABLE', [int(tok) for tok in f.read().split()[:-1]]
+        with open(os.path.join(directory, 'count')) as f:
+            count = int(f.read())
+        names = os.listdir(directory)
+        if sum(1 for name in names if name.endswith('.unsat')) == count:
+            return 'UNSATISFIABLE', None
+        time.sleep(poll)
+
+#-----------------------------------------------------------------
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Solve a DIMACS CNF file by cube-and-conquer.')
+    parser.add_argument('file', nargs='?', help='DIMACS .cnf file, optionally compressed')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='number of local workers (default: one per CPU)')
+    parser.add_argument('--depth', type=int, default=None,
+                        help='number of variables to split on')
+    parser.add_argument('--heuristic', default='VSIDS', choices=['VSIDS', 'JW', 'JW2'])
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--split', metavar='DIR', help='write the cubes to DIR and stop')
+    group.add_argument('--work', metavar='DIR', help='solve cubes from DIR')
+    group.add_argument('--collect', metavar='DIR', help='wait for the answer in DIR')
+    args = parser.parse_args()
+    if args.file is None and not args.collect:
+        parser.error('a DIMACS file is needed unless collecting')
+
+    if args.collect:
+        result, model = collectCubes(args.collect)
+    elif args.split:
+        solver = Solver(parseDIMACS(args.file), args.heuristic)
+        cubes = makeCubes(solver, args.depth or defaultDepth(args.processes or multiprocessing.cpu_count()))
+        writeCubes(cubes, args.split)
+        result = '%d cubes' % len(cubes)
+    elif args.work:
+        result = '%d cubes solved' % workDirectory(parseDIMACS(args.file), args.work, args.heuristic)
+    else:
+        result, model, cube = solveCubes(parseDIMACS(args.file), args.processes, args.depth, args.heuristic)
+    print(repr(result))
@@ -1,5 +1,6 @@
 '''
-    Code to implement decision heuristics - Jeroslow-Wang and VSIDS
+    Code to implement decision heuristics - Jeroslow-Wang (one- and
+    two-sided) and VSIDS
 
     Authors - Het Shah, Ishita Mediratta
 
@@ -10,9 +11,24 @@
 '''
 
 import argparse
-import numpy as np
+import ast
+import bz2
+import fileinput
+import gzip
+import json
+import random
+import sys
+import time
+from array import array
+from collections import deque
 from itertools import compress
-from numpy import sign, floor
+
+from simplify import Simplifier
+
+try:
+    import lzma
+except ImportError:
+    lzma = None
 
 #-----------------------------------------------------------------
 
@@ -20,63 +36,303 @@ def parseCNF(formula):
     '''
         Parses the string format into the DIMACS CNF format.
     '''
-    no_of_clauses = len(formula)
-    no_of_vars = 1
     symbols = {}
-
-    for c in formula:
-        for l in c:
-            if(len(l)>1):
-                if l[1] not in symbols:
-                    symbols[l[1]] = no_of_vars;
-                    no_of_vars = no_of_vars + 1;
-                continue;
-            else:
-                if l[0] not in symbols:
-                    symbols[l[0]] = no_of_vars;
-                    no_of_vars = no_of_vars + 1;
-                continue;
-
     clauses = []
 
+    # Variables are numbered in order of first appearance, in one pass
     for c in formula:
         clause = []
         for l in c:
+            name = l[1] if len(l) > 1 else l[0]
+            if name not in symbols:
+                symbols[name] = len(symbols) + 1
             if(len(l)>1):
-                clause.append(-1*symbols[l[1]])
+                clause.append(-1*symbols[name])
             else:
-                clause.append(symbols[l[0]])
+                clause.append(symbols[name])
         clauses.append(clause)
 
+    return clauses
 
-    #print(clauses)
+def openDIMACS(path):
+    '''
+        Opens a DIMACS file for reading in binary mode, decompressing
+        gzip, bzip2 or xz input based on its leading bytes. xz needs the
+        lzma module, which comes with Python 3.
+    '''
+    with open(path, 'rb') as f:
+        magic = f.read(6)
+    if magic[:2] == b'\x1f\x8b':
+        return gzip.open(path, 'rb')
+    if magic[:3] == b'BZh':
+        return bz2.BZ2File(path, 'rb')
+    if magic == b'\xfd7zXZ\x00':
+        if lzma is None:
+            raise ImportError('Reading xz-compressed DIMACS needs the lzma module')
+        return lzma.open(path, 'rb')
+    return open(path, 'rb')
 
-    return clauses
+def parseDIMACS(source):
+    '''
+        Reads a DIMACS CNF file (a path or a binary file object) and
+        yields its clauses one at a time as lists of ints, so that the
+        Solver can be built without holding the text in memory.
+    '''
+    f = openDIMACS(source) if isinstance(source, str) else source
+    try:
+        clause = []
+        for line in f:
+            first = line[:1]
+            if first in (b'c', b'p') or not line.strip():
+                # Comment or header; the header counts are not needed
+                continue
+            if first == b'%':
+                # SATLIB end marker
+                break
+            lits = [int(tok) for tok in line.split()]
+            if not clause and lits[-1] == 0 and lits.count(0) == 1:
+                # The usual layout: exactly one clause on the line
+                lits.pop()
+                yield lits
+                continue
+            for lit in lits:
+                if lit == 0:
+                    yield clause
+                    clause = []
+                else:
+                    clause.append(lit)
+        if clause:
+            # Tolerate a missing terminating 0 on the last clause
+            yield clause
+    finally:
+        if f is not source:
+            f.close()
+
+#-----------------------------------------------------------------
+
+def luby(i):
+    '''
+        Returns the i-th term (from 0) of the Luby sequence 1, 1, 2, 1, 1, 2, 4, ...
+    '''
+    size = 1
+    seq = 0
+    while size < i + 1:
+        seq += 1
+        size = 2 * size + 1
+    while size - 1 != i:
+        size = (size - 1) >> 1
+        seq -= 1
+        i = i % size
+    return 2 ** seq
+
+#-----------------------------------------------------------------
+
+class VarHeap:
+    '''
+    Binary max-heap of variables ordered by score[var]. The position of
+    every variable in the heap is kept in self.index, so a variable whose
+    score changes can be moved in O(log n) without searching for it.
+    '''
+    def __init__(self, score, variables=()):
+        self.score = score  # Shared per-variable score list, read on every comparison
+        self.heap = []
+        self.index = [-1] * len(score)  # Heap position of each variable (-1 if absent)
+        for var in variables:
+            self.insert(var)
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, var):
+        return self.index[var] >= 0
+
+    def insert(self, var):
+        '''
+        Add var to the heap if it is not already there.
+        '''
+        if self.index[var] >= 0:
+            return
+        self.index[var] = len(self.heap)
+        self.heap.append(var)
+        self.sift_up(self.index[var])
+
+    def update(self, var):
+        '''
+        Restore the heap order after score[var] changed.
+        '''
+        if self.index[var] >= 0:
+            self.sift_up(self.index[var])
+            self.sift_down(self.index[var])
+
+    def pop(self):
+        '''
+        Remove and return the variable with the highest score.
+        '''
+        heap = self.heap
+        top = heap[0]
+        last = heap.pop()
+        self.index[top] = -1
+        if heap:
+            heap[0] = last
+            self.index[last] = 0
+            self.sift_down(0)
+        return top
+
+    def sift_up(self, pos):
+        heap, score, index = self.heap, self.score, self.index
+        var = heap[pos]
+        while pos > 0:
+            parent = (pos - 1) >> 1
+            if score[heap[parent]] >= score[var]:
+                break
+            heap[pos] = heap[parent]
+            index[heap[pos]] = pos
+            pos = parent
+        heap[pos] = var
+        index[var] = pos
+
+    def sift_down(self, pos):
+        heap, score, index = self.heap, self.score, self.index
+        var = heap[pos]
+        n = len(heap)
+        while True:
+            child = 2 * pos + 1
+            if child >= n:
+                break
+            if child + 1 < n and score[heap[child + 1]] > score[heap[child]]:
+                child += 1
+            if score[heap[child]] <= score[var]:
+                break
+            heap[pos] = heap[child]
+            index[heap[pos]] = pos
+            pos = child
+        heap[pos] = var
+        index[var] = pos
+
+#-----------------------------------------------------------------
+
+class ClauseArena:
+    '''
+    Clause store that keeps every literal in one flat array('i'). Each
+    clause is described by an offset into it and a length, and is
+    referred to by its index in those header arrays.
+    '''
+    def __init__(self):
+        self.lits = array('i')
+        self.offset = array('l')
+        self.length = array('i')
+
+    def __len__(self):
+        return len(self.offset)
+
+    def __getitem__(self, c):
+        start = self.offset[c]
+        return self.lits[start:start + self.length[c]]
+
+    def __iter__(self):
+        for c in range(len(self.offset)):
+            yield self[c]
+
+    def add(self, clause):
+        '''
+        Append a clause and return its index.
+        '''
+        self.offset.append(len(self.lits))
+        self.length.append(len(clause))
+        self.lits.extend(clause)
+        return len(self.offset) - 1
+
+    def compact(self, remove):
+        '''
+        Drop the clauses flagged in remove, closing the gaps they leave.
+        Surviving clauses keep their order.
+        '''
+        lits = array('i')
+        offset = array('l')
+        length = array('i')
+        for c in range(len(self.offset)):
+            if not remove[c]:
+                offset.append(len(lits))
+                length.append(self.length[c])
+                lits.extend(self[c])
+        self.lits, self.offset, self.length = lits, offset, length
 
 #-----------------------------------------------------------------
 
 class Solver:
-    def __init__(self, clauses,heuristic):
+    def __init__(self, clauses,heuristic,restart='luby',seed=None,simplify=False,frozen=()):
         '''
         Create CDCL Solver object and preprocess the CNF clauses.
+
+        clauses can be any iterable of clauses, for example a list from
+        parseCNF or the generator returned by parseDIMACS; it is consumed
+        once, clause by clause.
+
+        restart is one of 'luby' (Luby sequence times 100 conflicts),
+        'geometric' (100 conflicts, growing by 1.5x), 'glucose' (when the
+        LBD of recent learned clauses rises above the running average)
+        or None to never restart.
+
+        seed, when given, breaks ties in the initial variable order and
+        picks the initial phases at random, so that solvers differing only
+        in the seed take different paths through the search.
+
+        simplify runs the Simplifier over the clauses before search.
+        Satisfiability is kept, and get_model() still gives a model of the
+        original clauses, but some variables may be eliminated: those can
+        no longer appear in assumptions or in add_clause() unless they are
+        listed in frozen, and iter_models() only sees the variables left.
         '''
         # Things we need to keep track of
         self.clauses = clauses
-        self.literals = []  # List of literals
-        self.decision = []  # Literal decisions (0, u, or 1)
-        self.w1 = []  # List of watched literals, two per clause
-        self.w2 = []
-        self.iw1 = []  # List of indices of watched literals, two per clause
-        self.iw2 = []
-        self.wpos = []  # List of clauses containing positive version of this literal (one per literal)
+        self.literals = []  # List of variables, in order of first occurrence
+        self.nvars = 0  # Largest variable; the per-variable lists below are indexed by it
+        self.decision = []  # Variable decisions (0, u, or 1)
+        self.w1 = array('i')  # Watched literals, two per clause
+        self.w2 = array('i')
+        self.wpos = []  # List of clauses watching the positive literal of this variable
         self.wneg = []  # Negative literal
-        self.levels = []  # List of levels at which each decision was made
-        self.polarity = []  # Literal VSIDS score
+        self.learned = array('b')  # Whether each clause was learned during search
+        self.lbd = array('i')  # Literal block distance of each clause, from when it was learned
+        self.activity = array('d')  # Clause activity, bumped when a clause takes part in a conflict
+        self.cla_inc = 1.0
+        self.cla_decay = 0.999
+        self.reduce_interval = 2000  # Conflicts between learned clause database reductions
+        self.next_reduce = 2000
+        self.levels = []  # Level at which each variable was decided
+        self.polarity = []  # Variable VSIDS activity
+        self.var_inc = 1.0  # Amount added to an activity on a bump
+        self.var_decay = 0.95  # var_inc grows by 1/var_decay after every conflict
+        self.order = None  # Heap of candidate decision variables
+        self.jw_pos = []  # Jeroslow-Wang score of the positive literal of each variable
+        self.jw_neg = []  # Negative literal
+        self.jw_score = []  # Variable JW score (max of the two for 'JW', sum for 'JW2')
+        self.saved_phase = []  # Last value of each variable (0 if never assigned)
+        self.restart = restart
+        self.restart_unit = 100  # Conflicts per unit of the restart schedule
+        self.restart_limit = 100  # Conflicts allowed before the next restart
+        self.conflicts_since_restart = 0
+        self.lbd_queue = deque(maxlen=50)  # LBDs of the most recent learned clauses
+        self.lbd_total = 0  # Sum of the LBDs of all learned clauses
+        self.decisions = 0
+        self.conflicts = 0
+        self.restarts = 0
         self.level = 0  # Current decision level
-        self.conflict_clause = []
-        self.propagate_queue = []
-        self.implied_by = []
+        self.conflict_clause = -1  # Index of the clause falsified by propagation
+        self.trail = []  # Assigned literals, in the order they were assigned
+        self.trail_lim = []  # Trail position at which each decision level starts
+        self.qhead = 0  # Trail position of the next literal to propagate
+        self.implied_by = []  # Clause that implied each variable (-1 if none)
+        self.seen = []  # Scratch marks for conflict analysis, all False between calls
         self.heuristic = heuristic
+        self.occurs = []  # Whether each variable has been seen (is in self.literals)
+        self.ok = True  # False once the clauses are unsatisfiable without assumptions
+        self.failed_assumptions = []
+        self.deadline = None  # time.time() at which search gives up, answering 'UNKNOWN'
+        self.seed = seed
+        self.simplify = simplify
+        self.frozen = frozen
+        self.simplifier = None  # Simplifier holding what get_model() needs for eliminated variables
         # Preprocess
         self.preprocess()
 
@@ -84,61 +340,202 @@ class Solver:
         '''
         Set up variables/graph for CDCL solving.
         '''
+        # The per-variable lists are indexed directly by variable and
+        # grow as larger variables show up in the clause stream
+        self.grow(0)
+        clauses = self.clauses
+        self.clauses = ClauseArena()
+        if self.simplify:
+            self.simplifier = Simplifier(clauses, self.frozen)
+            self.ok = self.simplifier.run()
+            clauses = self.simplifier.simplified() if self.ok else []
+
         # Initialize all our tracking variables
-        # NOTE: We assume all clauses have length > 0
-        for i in range(len(self.clauses)):
+        units = []
+        for clause in clauses:
+            if not clause:
+                # An empty clause (a lone 0 in DIMACS) can never be satisfied
+                self.ok = False
+                continue
             # Remove duplicates in the clause
-            self.clauses[i] = list(set(self.clauses[i]))
+            clause = list(set(clause))
+            i = self.clauses.add(clause)
+            top = max([abs(lit) for lit in clause])
+            if top > self.nvars:
+                self.grow(top)
 
             # It's fine to initialize the two watched 
             # literals to the first two literals in the clause
             # or the first literal in the clause if length = 1
-            if len(self.clauses[i]) > 1:
-                self.w1.append(self.clauses[i][0])
-                self.w2.append(self.clauses[i][1])
-                self.iw1.append(0)
-                self.iw2.append(1)
-                self.implied_by.append(-1)
+            if len(clause) > 1:
+                self.w1.append(clause[0])
+                self.w2.append(clause[1])
             else:
-                self.w1.append(self.clauses[i][0])
-                self.w2.append(self.clauses[i][0])
-                self.iw1.append(0)
-                self.iw2.append(0)
-                self.implied_by.append(-1)
-            for lit in self.clauses[i]:
-                if abs(lit) not in self.literals:
-                    # We need to establish a new literal
-                    # and all of its trappings
-                    self.literals.append(abs(lit))
-                    self.polarity.append(1)
-                    self.decision.append(0)
-                    self.levels.append(0)
-                    self.implied_by.append(-1)
-                    if lit > 0:
-                        self.wpos.append([i])
-                        self.wneg.append([])
-                    else:
-                        self.wpos.append([])
-                        self.wneg.append([i])
-                else:
-                    j = self.literals.index(abs(lit))
-                    self.polarity[j] += 1
+                self.w1.append(clause[0])
+                self.w2.append(clause[0])
+            self.watch(self.w1[i], i)
+            if self.w2[i] != self.w1[i]:
+                self.watch(self.w2[i], i)
+            self.learned.append(False)
+            self.lbd.append(0)
+            self.activity.append(0.0)
+            if len(clause) == 1:
+                units.append(clause[0])
+            for lit in clause:
+                var = abs(lit)
+                if not self.occurs[var]:
+                    # We need to establish a new variable
+                    self.occurs[var] = True
+                    self.literals.append(var)
+                self.polarity[var] += 1
+        if self.simplifier is not None:
+            # Frozen variables stay known even when simplification
+            # removed every clause they were in
+            for var in self.frozen:
+                if var > self.nvars:
+                    self.grow(var)
+                if not self.occurs[var]:
+                    self.occurs[var] = True
+                    self.literals.append(var)
+
+        # Occurrence counts seed the activities; every unassigned
+        # variable stays in the heap so decisions never scan
+        n = self.nvars + 1
+        if self.heuristic == 'VSIDS':
+            self.polarity = [float(x) for x in self.polarity]
+            score = self.polarity
+        elif self.heuristic in ('JW', 'JW2'):
+            # JW scores are computed once here and afterwards only
+            # adjusted for clauses that are learned or deleted
+            self.jw_pos = [0.0] * n
+            self.jw_neg = [0.0] * n
+            self.jw_score = [0.0] * n
+            for clause in self.clauses:
+                weight = 2.0 ** -len(clause)
+                for lit in clause:
                     if lit > 0:
-                        self.wpos[j].append(i)
+                        self.jw_pos[lit] += weight
                     else:
-                        self.wneg[j].append(i)
+                        self.jw_neg[-lit] += weight
+            for var in self.literals:
+                self.jw_score[var] = self.jw_var_score(var)
+            score = self.jw_score
+        else:
+            raise ValueError('Unknown heuristic: %r' % (self.heuristic,))
+        if self.seed is not None:
+            rng = random.Random(self.seed)
+            for var in self.literals:
+                # A nudge of at most 0.1%: mostly reorders equal scores
+                score[var] += rng.random() * 1e-3 * (score[var] or 1.0)
+                self.saved_phase[var] = rng.choice((1, -1))
+        self.order = VarHeap(score, self.literals)
+        if self.restart not in ('luby', 'geometric', 'glucose', None):
+            raise ValueError('Unknown restart strategy: %r' % (self.restart,))
+
+        # Unit clauses are asserted once, here; propagation only ever
+        # looks at clauses through their watched literals
+        for lit in units:
+            if self.decision[abs(lit)] == 0:
+                self.apply_literal(lit)
+
+    def grow(self, nvars):
+        '''
+        Extend the per-variable lists to hold variables up to nvars.
+        '''
+        extra = nvars + 1 - len(self.decision)
+        self.decision.extend([0] * extra)
+        self.levels.extend([0] * extra)
+        self.polarity.extend([0] * extra)
+        self.implied_by.extend([-1] * extra)
+        self.seen.extend([False] * extra)
+        self.saved_phase.extend([0] * extra)
+        self.wpos.extend([[] for _ in range(extra)])
+        self.wneg.extend([[] for _ in range(extra)])
+        self.occurs.extend([False] * extra)
+        if self.order is not None:
+            # Growing after preprocess, from add_clause()
+            if self.heuristic != 'VSIDS':
+                self.jw_pos.extend([0.0] * extra)
+                self.jw_neg.extend([0.0] * extra)
+                self.jw_score.extend([0.0] * extra)
+            self.order.index.extend([-1] * extra)
+        self.nvars = nvars
+
+    def new_var(self, var):
+        '''
+        Make sure var is known to the solver, after preprocess.
+        '''
+        simplifier = self.simplifier
+        if simplifier is not None and var < len(simplifier.eliminated) and simplifier.eliminated[var]:
+            raise ValueError('Variable %d was eliminated by simplification; list it in frozen' % var)
+        if var > self.nvars:
+            self.grow(var)
+        if not self.occurs[var]:
+            self.occurs[var] = True
+            self.literals.append(var)
+            self.order.insert(var)
+
+    def jw_var_score(self, var):
+        '''
+        One-sided JW ranks a variable by its best literal, two-sided
+        JW by the sum over both literals.
+        '''
+        if self.heuristic == 'JW2':
+            return self.jw_pos[var] + self.jw_neg[var]
+        return max(self.jw_pos[var], self.jw_neg[var])
+
+    def jw_update(self, clause, sign):
+        '''
+        Add (sign=1) or remove (sign=-1) the JW contribution of a clause.
+        '''
+        weight = sign * 2.0 ** -len(clause)
+        for lit in clause:
+            var = abs(lit)
+            if lit > 0:
+                self.jw_pos[var] += weight
+            else:
+                self.jw_neg[var] += weight
+            self.jw_score[var] = self.jw_var_score(var)
+            self.order.update(var)
+
+    def watch(self, lit, clause_idx):
+        '''
+        Put the clause on the watch list of lit.
+        '''
+        if lit > 0:
+            self.wpos[lit].append(clause_idx)
+        else:
+            self.wneg[-lit].append(clause_idx)
+
+    def watch_clause(self, clause_idx):
+        '''
+        Choose the two watched literals of a clause added during search:
+        true or unassigned literals first, then the most recently assigned
+        false ones, so that the watch invariant holds after backtracking.
+        '''
+        clause = self.clauses[clause_idx]
+        def rank(k):
+            var = abs(clause[k])
+            value = self.decision[var] if clause[k] > 0 else -self.decision[var]
+            if value >= 0:
+                return (1, 0)
+            return (0, self.levels[var])
+        order = sorted(range(len(clause)), key=rank, reverse=True)
+        self.w1.append(clause[order[0]])
+        self.w2.append(clause[order[1] if len(order) > 1 else order[0]])
+        self.watch(self.w1[clause_idx], clause_idx)
+        if self.w2[clause_idx] != self.w1[clause_idx]:
+            self.watch(self.w2[clause_idx], clause_idx)
                         
     def print_state(self):
         '''
         Print the current state of the solver. For debugging.
         '''
-        print('Clauses: ', self.clauses)
+        print('Clauses: ', [list(clause) for clause in self.clauses])
         print('Literals: ', self.literals)
         print('Decision:', self.decision)
         print('Watched 1: ', self.w1)
         print('Watched 2:', self.w2)
-        print('Watched 1 Index: ', self.iw1)
-        print('Watched 2 Index:', self.iw2)
         print('Watched positive: ', self.wpos)
         print('Watched negative: ', self.wneg)
         print('Levels: ', self.levels)
@@ -148,228 +545,691 @@ class Solver:
         '''
         VSIDS/Jeroslow-Wang check for new literal.
         '''
-        if self.heuristic == 'VSIDS':
-          literals_sorted = [x for _,x in sorted(zip(self.polarity,self.literals))]
-          literals_undecided = [x for x in literals_sorted if self.decision[self.literals.index(x)] == 0]
-          lit = literals_undecided[-1]
-          self.apply_literal(lit)
-        elif self.heuristic == 'JW':
-          counter = {}
-          for clause in self.clauses:
-              for literal in clause:
-                  if literal in counter:
-                      counter[literal] += 2 ** -len(clause)
-                  else:
-                      counter[literal] = 2 ** -len(clause)
-
-          lit = max(counter, key=counter.get)
-          self.apply_literal(lit)
-
-    def resolve(self, clause):
-        '''
-        Used to resolve the conflict clause. See resolve rule in Handbook of Satisfiability,
-        Chapter 4.
-        '''
-        decision_made = [x for x in clause if self.decision[self.literals.index(abs(x))] != 0]
-        return list(set([x for x in decision_made if ((not ((x in clause) and (-x in clause))))]))
-    
+        self.decisions += 1
+        self.apply_literal(self.preferred_literal(self.pick_variable()))
+
+    def pick_variable(self):
+        '''
+        Take the unassigned variable with the best VSIDS/JW score off the
+        heap. A caller that does not assign it must insert it back.
+        '''
+        # Assigned variables are skipped here rather than removed
+        # eagerly; backtracking puts them back
+        var = self.order.pop()
+        while self.decision[var] != 0:
+            var = self.order.pop()
+        return var
+
+    def preferred_literal(self, var):
+        '''
+        The literal of var to try first.
+        '''
+        if self.saved_phase[var] != 0:
+          # Phase saving: reuse the value the variable last had
+          return var * self.saved_phase[var]
+        elif self.heuristic == 'VSIDS':
+          return var
+        else:
+          # JW: take the better-scoring literal of the variable
+          if self.jw_pos[var] >= self.jw_neg[var]:
+              return var
+          else:
+              return -var
+
     def analyze_conflict(self):
         '''
         Analyze the conflict, return a conflict clause and a backtrack level.
-        '''
-        # Grab the literals we need to backtrack
-        backtrack_idxs = [self.literals.index(abs(x)) for x in self.conflict_clause\
-                              if (self.levels[self.literals.index(abs(x))] == self.level)]
 
-        conflict = []
-                    
-        for idx in backtrack_idxs:
-            if self.implied_by[idx] > 0:
-                conflict.extend(self.clauses[self.implied_by[idx]])
-                    
-        conflict.extend(self.conflict_clause)
+        The conflict clause is resolved with the reasons of its current-level
+        literals, newest first along the trail, until a single current-level
+        literal (the first UIP) remains. The learned clause has the negated
+        UIP first and a literal of the backtrack level second.
+        '''
+        if self.level == 0:
+            return -1, []
 
-        learned_clause = self.resolve(conflict)
+        seen = self.seen
+        levels = self.levels
+        trail = self.trail
+        learned_clause = [0]  # Slot for the asserting literal
+        pending = 0  # Current-level literals still to be resolved away
+        c = self.conflict_clause
+        lit = 0
+        idx = len(trail) - 1
+        while True:
+            if self.learned[c]:
+                self.bump_clause(c)
+            for x in self.clauses[c]:
+                var = abs(x)
+                if x == lit or seen[var] or levels[var] == 0:
+                    continue
+                seen[var] = True
+                self.bump(var)
+                if levels[var] == self.level:
+                    pending += 1
+                else:
+                    learned_clause.append(x)
+            # Resolve on the most recently assigned literal of the conflict
+            while not seen[abs(trail[idx])]:
+                idx -= 1
+            lit = trail[idx]
+            idx -= 1
+            seen[abs(lit)] = False
+            pending -= 1
+            if pending == 0:
+                break
+            c = self.implied_by[abs(lit)]
+        learned_clause[0] = -lit
 
-        levels = [self.levels[self.literals.index(abs(x))] for x in learned_clause]
+        learned_clause = self.minimize(learned_clause)
 
-        b = max(levels)
-        if b == 0:
-            b = -1
+        # Backjump to the highest level left among the other literals,
+        # where the learned clause becomes unit
+        b = 0
+        if len(learned_clause) > 1:
+            k = max(range(1, len(learned_clause)), key=lambda i: levels[abs(learned_clause[i])])
+            learned_clause[1], learned_clause[k] = learned_clause[k], learned_clause[1]
+            b = levels[abs(learned_clause[1])]
         return b, learned_clause
+
+    def minimize(self, learned_clause):
+        '''
+        Drop the literals of the learned clause that are implied by the
+        rest of it, following reasons recursively. Expects seen[] set for
+        the literals of the clause and clears it.
+        '''
+        seen = self.seen
+        to_clear = list(learned_clause[1:])
+        # One bit per decision level present, to cut the search early
+        abstract = 0
+        for x in learned_clause[1:]:
+            abstract |= 1 << (self.levels[abs(x)] & 31)
+        kept = [learned_clause[0]]
+        for x in learned_clause[1:]:
+            if self.implied_by[abs(x)] == -1 or not self.redundant(x, abstract, to_clear):
+                kept.append(x)
+        for x in to_clear:
+            seen[abs(x)] = False
+        return kept
+
+    def redundant(self, lit, abstract, to_clear):
+        '''
+        Check whether lit follows from literals already in the learned
+        clause, by exploring its implication graph depth first.
+        '''
+        seen = self.seen
+        levels = self.levels
+        implied_by = self.implied_by
+        stack = [lit]
+        top = len(to_clear)
+        while stack:
+            var = abs(stack.pop())
+            for x in self.clauses[implied_by[var]]:
+                v = abs(x)
+                if v == var or seen[v] or levels[v] == 0:
+                    continue
+                if implied_by[v] != -1 and (abstract >> (levels[v] & 31)) & 1:
+                    seen[v] = True
+                    stack.append(x)
+                    to_clear.append(x)
+                else:
+                    # Reached a decision, or a level not in the clause
+                    for y in to_clear[top:]:
+                        seen[abs(y)] = False
+                    del to_clear[top:]
+                    return False
+        return True
     
     def backtrack(self, b, learned_clause):
         '''
         Undo whatever created a conflict.
         '''
+        # Jump back to the assertion level
+        self.cancel_until(b)
+
         # Add the learned clause to our clauses
-        self.clauses.append(learned_clause)
-        if len(learned_clause) > 1:
-            self.w1.append(learned_clause[0])
-            self.iw1.append(0)
-            self.w2.append(learned_clause[1])
-            self.iw2.append(1)
-            self.implied_by.append(-1)
-        else:
-            self.w1.append(learned_clause[0])
-            self.iw1.append(0)
-            self.w2.append(learned_clause[0])
-            self.iw2.append(0)
-            self.implied_by.append(-1)
-            
-        temp_levels = [self.levels[self.literals.index(abs(x))] for x in learned_clause]
-                
-        # Update "pointers"
-        clause_idx = len(self.clauses)-1
-        for lit in learned_clause:
-            lit_idx = self.literals.index(abs(lit))
-            self.implied_by[lit_idx] = -1
-            # Update the polarity
-            self.polarity[lit_idx] += 1
-            # Update the watched positives/negatives
-            if lit > 0:
-                self.wpos[lit_idx].append(clause_idx)
-            else:
-                self.wneg[lit_idx].append(clause_idx)
-                
-        # Undo variable assignments
-        for level_idx in range(len(self.levels)):
-            if self.levels[level_idx] >= b:
-                self.levels[level_idx] = 0
-                self.decision[level_idx] = 0
-        
-        # Set the level
-        self.level = b
-                
-        # Flip the variables that need flipping
-        for i in range(len(learned_clause)):
-            if temp_levels[i] == b:
-                self.apply_literal(learned_clause[i])
+        clause_idx = self.clauses.add(learned_clause)
+        if self.heuristic != 'VSIDS':
+            self.jw_update(learned_clause, 1)
+        self.watch_clause(clause_idx)
+        self.learned.append(True)
+        self.lbd.append(len(set([self.levels[abs(x)] for x in learned_clause])))
+        self.activity.append(0.0)
+        self.bump_clause(clause_idx)
+
+        # The learned clause is now unit: assert its first literal
+        self.apply_literal(learned_clause[0], clause_idx)
                 
+    def bump_clause(self, clause_idx):
+        '''
+        Raise the activity of a learned clause involved in a conflict.
+        '''
+        self.activity[clause_idx] += self.cla_inc
+        if self.activity[clause_idx] > 1e20:
+            for c in range(len(self.clauses)):
+                self.activity[c] *= 1e-20
+            self.cla_inc *= 1e-20
+
+    def reduce_db(self):
+        '''
+        Delete the worse half of the learned clauses, ranked by LBD and then
+        by activity. Glue clauses (LBD <= 2) and clauses that are currently
+        the reason for an assignment are always kept.
+        '''
+        locked = set([self.implied_by[abs(lit)] for lit in self.trail])
+        candidates = [c for c in range(len(self.clauses))
+                      if self.learned[c] and self.lbd[c] > 2 and c not in locked]
+        candidates.sort(key=lambda c: (self.lbd[c], -self.activity[c]))
+        remove = [False] * len(self.clauses)
+        for c in candidates[len(candidates)//2:]:
+            remove[c] = True
+            if self.heuristic != 'VSIDS':
+                self.jw_update(self.clauses[c], -1)
+        self.compact(remove)
+
+    def compact(self, remove):
+        '''
+        Drop the clauses flagged in remove and renumber the rest, rewriting
+        every clause index held in the watch lists and reasons.
+        '''
+        new_idx = []
+        j = 0
+        for c in range(len(self.clauses)):
+            new_idx.append(-1 if remove[c] else j)
+            j += not remove[c]
+        if j == len(self.clauses):
+            return
+        keep = lambda values: array(values.typecode, [v for v, r in zip(values, remove) if not r])
+        self.clauses.compact(remove)
+        self.w1 = keep(self.w1)
+        self.w2 = keep(self.w2)
+        self.learned = keep(self.learned)
+        self.lbd = keep(self.lbd)
+        self.activity = keep(self.activity)
+        for watched in self.wpos + self.wneg:
+            watched[:] = [new_idx[c] for c in watched if not remove[c]]
+        self.implied_by = [new_idx[c] if c >= 0 else -1 for c in self.implied_by]
+
+    def bump(self, var):
+        '''
+        Raise the VSIDS activity of a variable involved in a conflict.
+        '''
+        self.polarity[var] += self.var_inc
+        if self.polarity[var] > 1e100:
+            # Rescale everything before the floats overflow; relative
+            # order, and so the heap, is unchanged
+            for v in self.literals:
+                self.polarity[v] *= 1e-100
+            self.var_inc *= 1e-100
+        if self.heuristic == 'VSIDS':
+            self.order.update(var)
+
+    def cancel_until(self, level):
+        '''
+        Undo every assignment made above the given level, walking the
+        trail back only as far as that level's marker.
+        '''
+        if self.level <= level:
+            return
+        start = self.trail_lim[level]
+        for lit in self.trail[start:]:
+            var = abs(lit)
+            self.saved_phase[var] = self.decision[var]
+            self.decision[var] = 0
+            self.levels[var] = 0
+            self.implied_by[var] = -1
+            self.order.insert(var)
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        self.qhead = start
+        self.level = level
+
+    def restart_due(self):
+        '''
+        Checks whether the restart strategy calls for a restart now.
+        '''
+        if self.restart == 'glucose':
+            # Recent clauses are worse than average: the search has
+            # drifted somewhere unproductive
+            return (len(self.lbd_queue) == self.lbd_queue.maxlen and
+                    sum(self.lbd_queue) * 0.8 * self.conflicts > self.lbd_total * len(self.lbd_queue))
+        if self.restart is None:
+            return False
+        return self.conflicts_since_restart >= self.restart_limit
+
+    def restart_search(self):
+        '''
+        Undo every decision and set up the next restart interval. Learned
+        clauses, activities and saved phases are all kept.
+        '''
+        self.cancel_until(0)
+        self.restarts += 1
+        self.conflicts_since_restart = 0
+        self.lbd_queue.clear()
+        if self.restart == 'luby':
+            self.restart_limit = luby(self.restarts) * self.restart_unit
+        elif self.restart == 'geometric':
+            self.restart_limit = int(self.restart_limit * 1.5)
+
+    def new_level(self):
+        '''
+        Open a new decision level.
+        '''
+        self.trail_lim.append(len(self.trail))
+        self.level += 1
+
     def has_unassigned_literals(self):
         '''
         Checks if there is an undecided literal.
         '''
-        return (True in [x == 0 for x in self.decision])
+        return len(self.trail) < len(self.literals)
                 
-    def solve(self):
+    def solve(self, assumptions=(), timeout=None):
         '''
         Apply CDCL solver to self.clauses.
+
+        assumptions is a list of literals that must hold for this call only.
+        The solver can be called again, with add_clause() in between; learned
+        clauses are kept across calls. When the answer is 'UNSATISFIABLE'
+        because of the assumptions, get_failed_assumptions() gives a subset
+        of them that is already unsatisfiable with the clauses.
+
+        With timeout (in seconds), the answer is 'UNKNOWN' if the search is
+        still going after that long; the clock is checked on every conflict
+        and every decision, and setup in __init__ is not counted.
         '''
-        if self.unit_propagation() == 'CONFLICT':
-#             print('ALREADY?')
+        self.failed_assumptions = []
+        self.deadline = time.time() + timeout if timeout is not None else None
+        self.cancel_until(0)
+        if not self.ok:
             return 'UNSATISFIABLE'
-        self.level = 0
-        polarity_count = 0
-        while self.has_unassigned_literals():
-            #self.print_state()
-            self.level += 1
-            self.decide_literal()
+        assumptions = list(assumptions)
+        for lit in assumptions:
+            self.new_var(abs(lit))
+        return self.search(assumptions)
+
+    def search(self, assumptions):
+        '''
+        Run CDCL from the current state until every variable is assigned or
+        a conflict is left at level 0. Anything already on the trail and not
+        yet propagated is propagated first.
+        '''
+        while True:
             while self.unit_propagation() == 'CONFLICT':
-                polarity_count += 1
-                if polarity_count > 49:
-                    self.polarity = [int(floor(x/2)) for x in self.polarity]
-                    polarity_count = 0
+                self.conflicts += 1
+                self.conflicts_since_restart += 1
+                # Decaying every old activity is the same as growing
+                # the bump for new ones
+                self.var_inc /= self.var_decay
+                self.cla_inc /= self.cla_decay
                 
                 b, c = self.analyze_conflict()
                 
                 if b < 0:
+                    self.ok = False
                     return 'UNSATISFIABLE'
                 else:
-                    # Implicitly sets self.level = b
+                    # Sets self.level = b
                     self.backtrack(b, c)
-        
-        return 'SATISFIABLE'
+                    self.lbd_queue.append(self.lbd[-1])
+                    self.lbd_total += self.lbd[-1]
+
+                if self.conflicts >= self.next_reduce:
+                    self.reduce_db()
+                    self.reduce_interval += 300
+                    self.next_reduce = self.conflicts + self.reduce_interval
+
+                if self.deadline is not None and time.time() > self.deadline:
+                    return 'UNKNOWN'
+
+            #self.print_state()
+            if self.restart_due():
+                self.restart_search()
+                if not self.ok:
+                    # A clause added on restart (see portfolio.py) was
+                    # already false at level 0
+                    return 'UNSATISFIABLE'
+                continue
+            if self.level < len(assumptions):
+                # Assumptions take the first decision levels, one each
+                lit = assumptions[self.level]
+                value = self.decision[abs(lit)] if lit > 0 else -self.decision[abs(lit)]
+                if value < 0:
+                    self.failed_assumptions = self.analyze_final(lit)
+                    return 'UNSATISFIABLE'
+                self.new_level()
+                if value == 0:
+                    self.apply_literal(lit)
+            elif self.has_unassigned_literals():
+                if self.deadline is not None and time.time() > self.deadline:
+                    return 'UNKNOWN'
+                self.new_level()
+                self.decide_literal()
+            else:
+                return 'SATISFIABLE'
+
+    def analyze_final(self, lit):
+        '''
+        Find the assumptions that force the assumption lit to be false, by
+        following reasons back from -lit. Returns them together with lit.
+        '''
+        failed = [lit]
+        if self.levels[abs(lit)] == 0:
+            return failed
+        seen = self.seen
+        seen[abs(lit)] = True
+        for x in reversed(self.trail[self.trail_lim[0]:]):
+            var = abs(x)
+            if not seen[var]:
+                continue
+            if self.implied_by[var] == -1:
+                # Below the search levels every decision is an assumption,
+                # -lit included when both signs were assumed
+                failed.append(x)
+            else:
+                for y in self.clauses[self.implied_by[var]]:
+                    if abs(y) != var and self.levels[abs(y)] > 0:
+                        seen[abs(y)] = True
+            seen[var] = False
+        seen[abs(lit)] = False
+        return failed
+
+    def get_failed_assumptions(self):
+        '''
+        Get the assumptions behind the last 'UNSATISFIABLE' answer. Empty if
+        the clauses are unsatisfiable on their own.
+        '''
+        return self.failed_assumptions
+
+    def add_clause(self, clause):
+        '''
+        Add a clause between calls to solve(). Literals already false at
+        level 0 are dropped, and clauses already satisfied there are skipped.
+        '''
+        self.cancel_until(0)
+        if not self.ok:
+            return
+        clause = list(set(clause))
+        for lit in clause:
+            self.new_var(abs(lit))
+        values = [self.decision[abs(x)] if x > 0 else -self.decision[abs(x)] for x in clause]
+        if 1 in values:
+            return
+        clause = [x for x, v in zip(clause, values) if v == 0]
+        if not clause:
+            self.ok = False
+            return
+        i = self.clauses.add(clause)
+        self.w1.append(clause[0])
+        self.w2.append(clause[1] if len(clause) > 1 else clause[0])
+        self.watch(self.w1[i], i)
+        if self.w2[i] != self.w1[i]:
+            self.watch(self.w2[i], i)
+        self.learned.append(False)
+        self.lbd.append(0)
+        self.activity.append(0.0)
+        if self.heuristic != 'VSIDS':
+            self.jw_update(clause, 1)
+        if len(clause) == 1:
+            self.apply_literal(clause[0])
     
     def get_model(self):
         '''
         Get the current solution. Obviously this has no meaning if self.solve()
         returned 'UNSATISFIED'.
         '''
-        return [x*d for x,d in zip(self.literals,self.decision)]
-    
-    def apply_literal(self, lit):
+        model = [x*self.decision[x] for x in self.literals]
+        if self.simplifier is not None:
+            # Give values to the variables simplification eliminated
+            return self.simplifier.extend(model)
+        return model
+
+    def iter_models(self, variables=None, minimize=False, assumptions=()):
+        '''
+        Yield every model, one at a time, as a list of literals. Each model
+        found is ruled out with a blocking clause before searching again, so
+        learned clauses are kept and models never pile up in memory.
+
+        variables projects the models onto those variables: each distinct
+        assignment to them is yielded once. With minimize, the blocking
+        clause keeps only the literals the rest of the model follows from.
+        The blocking clauses stay in the solver afterwards, and the solver
+        must not be used for anything else until the generator is done.
+        '''
+        if variables is None:
+            variables = list(self.literals)
+        else:
+            variables = list(variables)
+            for var in variables:
+                self.new_var(var)
+        assumptions = list(assumptions)
+        result = self.solve(assumptions)
+        while result == 'SATISFIABLE':
+            model = [x*self.decision[x] for x in variables]
+            if minimize:
+                block = [-x for x in self.blocking_literals(variables)]
+            else:
+                block = [-x for x in model]
+            yield model
+            self.block(block)
+            if not self.ok:
+                return
+            result = self.search(assumptions)
+
+    def block(self, clause):
+        '''
+        Add a clause that the current model falsifies, and jump back to the
+        level where it becomes unit rather than to level 0, so that search()
+        can carry on from there.
+        '''
+        clause = [x for x in clause if self.levels[abs(x)] > 0]
+        if not clause:
+            self.ok = False
+            return
+        clause.sort(key=lambda x: self.levels[abs(x)], reverse=True)
+        top = self.levels[abs(clause[0])]
+        second = self.levels[abs(clause[1])] if len(clause) > 1 else 0
+        # With two literals at the top level the clause is not unit anywhere
+        self.cancel_until(top - 1 if second == top else second)
+        clause_idx = self.clauses.add(clause)
+        if self.heuristic != 'VSIDS':
+            self.jw_update(clause, 1)
+        self.watch_clause(clause_idx)
+        self.learned.append(False)
+        self.lbd.append(0)
+        self.activity.append(0.0)
+        if second != top:
+            self.apply_literal(clause[0], clause_idx)
+
+    def blocking_literals(self, variables):
+        '''
+        Pick the literals of variables, in the current model, that imply the
+        rest of variables by unit propagation. A literal is implied when its
+        reason only rests on level 0, picked literals or other implied ones;
+        decisions outside variables imply nothing, so anything resting on
+        them has to be picked itself.
+        '''
+        wanted = set(variables)
+        implied = {}
+        picked = []
+        for lit in self.trail:
+            var = abs(lit)
+            reason = self.implied_by[var]
+            if self.levels[var] == 0:
+                implied[var] = True
+            elif reason == -1:
+                implied[var] = var in wanted
+                if implied[var]:
+                    picked.append(lit)
+            else:
+                implied[var] = all(implied[abs(x)] for x in self.clauses[reason] if abs(x) != var)
+                if not implied[var] and var in wanted:
+                    implied[var] = True
+                    picked.append(lit)
+        return picked
+
+    def apply_literal(self, lit, reason=-1):
         '''
         Let's update the literal and watched literals in the graph
         '''
-        i = self.literals.index(abs(lit))
-        self.decision[i] = sign(lit)
+        i = abs(lit)
+        self.decision[i] = 1 if lit > 0 else -1
         self.levels[i] = self.level
+        self.implied_by[i] = reason
         
-        self.propagate_queue.insert(0,lit)
+        self.trail.append(lit)
 
     def unit_propagation(self):
         '''
         Repeatedly apply UnitProp rule until no longer possible.
         '''
+        decision = self.decision
+        lits = self.clauses.lits
+        offset = self.clauses.offset
+        length = self.clauses.length
+        w1 = self.w1
+        w2 = self.w2
 
-        #If we have unit clauses, make a decision, add them to the queue
-        for i in range(len(self.clauses)):
-            if (len(self.clauses[i]) == 1) and (self.decision[self.literals.index(abs(self.clauses[i][0]))] == 0):
-                self.apply_literal(self.clauses[i][0])
-
-        while len(self.propagate_queue) > 0:
-            # Grab a literal from the queue
-            lit = self.propagate_queue.pop()
-            lit_idx = self.literals.index(abs(lit))
+        trail = self.trail
+        while self.qhead < len(trail):
+            # Grab the next literal off the trail; -lit has just become false
+            lit = trail[self.qhead]
+            self.qhead += 1
+            false_lit = -lit
             
-            # Find the clauses to consider
-            watched = self.wneg[lit_idx]
-            if lit < 0:
-                watched = self.wpos[lit_idx]
+            # Only the clauses watching -lit need to be looked at
+            watched = self.wneg[lit] if lit > 0 else self.wpos[-lit]
             
-            # Loop over said clauses
-            for i in watched:
-                i1 = self.literals.index(abs(self.w1[i]))
-                i2 = self.literals.index(abs(self.w2[i]))
-                s1 = sign(self.w1[i])
-                s2 = sign(self.w2[i])
-                d1 = self.decision[i1] * s1
-                d2 = self.decision[i2] * s2
+            # Loop over said clauses, compacting the watch list in place
+            # as clauses move their watch elsewhere
+            i = 0
+            j = 0
+            while i < len(watched):
+                c = watched[i]
+                i += 1
+                first = (w1[c] == false_lit)
+                other = w2[c] if first else w1[c]
+                d = decision[abs(other)] if other > 0 else -decision[abs(other)]
                 
-                if (d1 == 1) or (d2 == 1):
+                if d == 1:
                     # Already satisfied, we're done
+                    watched[j] = c
+                    j += 1
                     continue
                 
-                u = [x for x in self.clauses[i] if (((self.decision[self.literals.index(abs(x))] == 0) or (self.decision[self.literals.index(abs(x))]*sign(x) == 1)) and (x != self.w1[i]) and (x != self.w2[i]))]
+                # Look for a replacement watch, stopping at the first one
+                start = offset[c]
+                end = start + length[c]
+                k = start
+                while k < end:
+                    x = lits[k]
+                    if x != other and x != false_lit:
+                        dx = decision[abs(x)]
+                        if dx == 0 or (dx > 0) == (x > 0):
+                            break
+                    k += 1
 
-                # If so, do it
-                if (len(u) > 0) and ((d1 == -1) or (d2 == -1)):
-                    if abs(lit) == abs(self.w1[i]):
-                        self.w1[i] = u[0]
-                        self.iw1[i] = self.clauses[i].index(u[0])
-                    else:
-                        self.w2[i] = u[0]
-                        self.iw2[i] = self.clauses[i].index(u[0])
-                elif ((d1 == -1) and (d2 == -1)):
-                    self.conflict_clause = [self.w1[i], self.w2[i]]
-                    return 'CONFLICT'
-                elif ((d1 == 0) or (d2 == 0)) and not ((d1 == 0) and (d2 == 0)):
-                    if d1 == 0:
-                        self.apply_literal(self.clauses[i][self.iw1[i]])
-                        self.implied_by[i1] = i
+                if k < end:
+                    # Move the watch to lits[k]
+                    if first:
+                        w1[c] = x
                     else:
-                        self.apply_literal(self.clauses[i][self.iw2[i]])
-                        self.implied_by[i2] = i
+                        w2[c] = x
+                    self.watch(x, c)
+                    continue
+
+                watched[j] = c
+                j += 1
+                if d == 0:
+                    # Unit: the other watch is implied
+                    self.apply_literal(other, c)
                 else:
-                    pass
+                    # Every literal is false
+                    while i < len(watched):
+                        watched[j] = watched[i]
+                        i += 1
+                        j += 1
+                    del watched[j:]
+                    self.conflict_clause = c
+                    self.qhead = len(trail)
+                    return 'CONFLICT'
+            del watched[j:]
             
         return 'SATISFIABLE'
 
 #-----------------------------------------------------------------
 
+def parseLine(line):
+    '''
+        Parses one line of a batch: a JSON list of clauses, each a list
+        of DIMACS ints or of literals in the string format.
+    '''
+    clauses = json.loads(line)
+    if not all(isinstance(lit, int) for clause in clauses for lit in clause):
+        clauses = parseCNF(clauses)
+    return clauses
+
+def solveLine(line):
+    '''
+        Solves one line of a batch.
+    '''
+    clauses = parseLine(line)
+    if [] in clauses:
+        return 'UNSATISFIABLE'
+    return Solver(clauses, "JW").solve()
+
+def solveLines(lines):
+    '''
+        Yields the result of every non-blank line, or {"error": ...} for
+        a line that could not be solved, without stopping the batch.
+    '''
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield solveLine(line)
+        except Exception as e:
+            yield {'error': '%s: %s' % (type(e).__name__, e)}
+
+#-----------------------------------------------------------------
+
 '''
     Run "python dpll.py"
 
     Sample Input -> [['!p'],['p','q'],['p']]
     Output -> 'UNSATISFIABLE'
+
+    Or "python dpll.py file.cnf ..." to solve DIMACS files (optionally
+    gzip/bzip2/xz-compressed), one result per line
+
+    Or "python dpll.py --batch [file ...]" to solve one formula per line
+    of the files or stdin, e.g. [["!p"],["p","q"]] or [[-1],[1,2]],
+    with one line of JSON per result
 '''
 
 if __name__ == "__main__":
 
-    print("Enter a WFF in CNF:")
-    sentence = input()
-    print("Output:")
-    DPLL = Solver(parseCNF(sentence),"JW")
-    # DPLL = Solver(parseCNF(sentence),"VSIDS")
-    print repr(DPLL.solve())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='CDCL SAT solver')
+    parser.add_argument('files', nargs='*', help='DIMACS CNF files (default: read a WFF from stdin)')
+    parser.add_argument('--batch', nargs='*', metavar='FILE',
+                        help='solve one formula per line of the files (default: stdin)')
+    args = parser.parse_args()
+
+    if args.batch is not None:
+        for result in solveLines(fileinput.input(args.batch)):
+            sys.stdout.write(json.dumps(result) + '\n')
+            sys.stdout.flush()
+    elif args.files:
+        for path in args.files:
+            DPLL = Solver(parseDIMACS(path),"JW")
+            print(repr(DPLL.solve()))
+    else:
+        print("Enter a WFF in CNF:")
+        sentence = input()
+        if isinstance(sentence, str):
+            # Python 3 input() gives the text rather than the list
+            sentence = ast.literal_eval(sentence)
+        print("Output:")
+        DPLL = Solver(parseCNF(sentence),"JW")
+        # DPLL = Solver(parseCNF(sentence),"VSIDS")
+        print(repr(DPLL.solve()))
@@ -0,0 +1,174 @@
+'''
+    Batch solving with the CDCL Solver in dpll.py on a process pool
+
+    Run using "python pool.py file.cnf ..." or "python pool.py --batch [file ...]"
+    (one JSON list of clauses per line, as for "python dpll.py --batch")
+
+    Many independent instances are spread over a concurrent.futures process
+    pool, a chunk of them per task (Python 3, or Python 2 with the futures
+    backport installed). Instances travel to the workers as flat int arrays
+    (each clause followed by a 0, as in DIMACS) rather than nested lists,
+    and models come back the same way, which keeps pickling cheap when the
+    instances are small and numerous.
+'''
+
+import argparse
+import fileinput
+import json
+import multiprocessing
+import sys
+import time
+import traceback
+from array import array
+from collections import deque
+
+try:
+    from concurrent import futures
+except ImportError:
+    futures = None
+
+from dpll import Solver, parseDIMACS, parseLine
+
+#-----------------------------------------------------------------
+
+def flatten(clauses):
+    '''
+        Encodes clauses as one array of ints, each clause followed by a 0,
+        using the smallest item size that holds every literal.
+    '''
+    flat = []
+    for clause in clauses:
+        flat.extend(clause)
+        flat.append(0)
+    top = max([abs(lit) for lit in flat] + [0])
+    return array('b' if top < 1 << 7 else 'h' if top < 1 << 15 else 'i', flat)
+
+def unflatten(flat):
+    '''
+        Yields the clauses of a flat array, as lists of ints.
+    '''
+    clause = []
+    for lit in flat:
+        if lit == 0:
+            yield clause
+            clause = []
+        else:
+            clause.append(lit)
+
+def chunkInstances(instances, chunksize):
+    '''
+        Groups instances into lists of chunksize (index, flat clauses)
+        pairs, reading instances lazily.
+    '''
+    chunk = []
+    for index, clauses in enumerate(instances):
+        chunk.append((index, clauses if isinstance(clauses, array) else flatten(clauses)))
+        if len(chunk) == chunksize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+#-----------------------------------------------------------------
+
+def batchWorker(chunk, heuristic, timeout):
+    '''
+    Solve one chunk and return (index, result, model) for each of its
+    instances; model is a flat array of literals when the result is
+    'SATISFIABLE' and None otherwise. Errors are reported per instance
+    as ('ERROR', traceback).
+    '''
+    results = []
+    for index, flat in chunk:
+        try:
+            clauses = list(unflatten(flat))
+            if [] in clauses:
+                results.append((index, 'UNSATISFIABLE', None))
+                continue
+            start = time.time()
+            solver = Solver(clauses, heuristic)
+            if timeout is not None:
+                # Setup cannot be interrupted, but it uses up the time
+                result = solver.solve(timeout=max(timeout - (time.time() - start), 0))
+            else:
+                result = solver.solve()
+            model = array('i', solver.get_model()) if result == 'SATISFIABLE' else None
+            results.append((index, result, model))
+        except Exception:
+            results.append((index, 'ERROR', traceback.format_exc()))
+    return results
+
+def solveBatch(instances, processes=None, chunksize=16, timeout=None, ordered=True, heuristic='VSIDS'):
+    '''
+    Solve every instance of instances, an iterable of clause lists (or of
+    flat arrays from flatten()), on a pool of processes, and yield
+    (index, result, model) for each, index being its position in
+    instances. model is a list of literals when the result is
+    'SATISFIABLE' and None otherwise.
+
+    chunksize instances go to a worker per task. timeout limits the time
+    spent on each instance, which is 'UNKNOWN' when it runs out. The clock
+    is only checked once search has started (on every conflict and every
+    decision), so setup always runs to the end and may overshoot it.
+    'ERROR' results come with a traceback in place of model.
+    With ordered, results come in the order of instances; otherwise in
+    the order they finish. Only a few chunks per process are read ahead
+    of the results, so instances can be a generator of any length.
+    '''
+    if futures is None:
+        raise ImportError('solveBatch needs concurrent.futures (the futures package on Python 2)')
+    processes = processes or multiprocessing.cpu_count()
+    with futures.ProcessPoolExecutor(processes) as executor:
+        pending = deque()
+        for chunk in chunkInstances(instances, chunksize):
+            pending.append(executor.submit(batchWorker, chunk, heuristic, timeout))
+            if len(pending) >= 4 * processes:
+                for item in takeResults(pending, ordered):
+                    yield item
+        while pending:
+            for item in takeResults(pending, ordered):
+                yield item
+
+def takeResults(pending, ordered):
+    '''
+    Wait for the oldest chunk, or with ordered=False for any one, take it
+    off pending and return its results with the models as lists.
+    '''
+    if ordered:
+        future = pending.popleft()
+    else:
+        future = next(iter(futures.wait(pending, return_when=futures.FIRST_COMPLETED)[0]))
+        pending.remove(future)
+    return [(index, result, list(model) if result == 'SATISFIABLE' else model)
+            for index, result, model in future.result()]
+
+#-----------------------------------------------------------------
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Solve many CNF instances on a process pool.')
+    parser.add_argument('files', nargs='*', help='DIMACS .cnf files, optionally compressed')
+    parser.add_argument('--batch', nargs='*', metavar='FILE',
+                        help='solve one formula per line of the files (default: stdin)')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='number of worker processes (default: one per CPU)')
+    parser.add_argument('--chunksize', type=int, default=16,
+                        help='instances per task')
+    parser.add_argument('--timeout', type=float, default=None,
+                        help='seconds per instance before giving up; only checked during search, '
+                             'so setup and preprocessing always finish')
+    parser.add_argument('--unordered', action='store_true',
+                        help='print results as they finish rather than in input order')
+    parser.add_argument('--heuristic', default='VSIDS', choices=['VSIDS', 'JW', 'JW2'])
+    args = parser.parse_args()
+
+    if args.batch is not None:
+        instances = (parseLine(line) for line in fileinput.input(args.batch) if line.strip())
+    else:
+        instances = (parseDIMACS(path) for path in args.files)
+    for index, result, model in solveBatch(instances, args.processes, args.chunksize,
+                                           args.timeout, not args.unordered, args.heuristic):
+        if result == 'ERROR':
+            sys.stderr.write(model)
+        sys.stdout.write(json.dumps([index, result]) + '\n')
+        sys.stdout.flush()
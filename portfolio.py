@@ -0,0 +1,165 @@
+'''
+    Parallel portfolio for the CDCL Solver in dpll.py
+
+    Run using "python portfolio.py file.cnf"
+
+    Differently configured solvers (heuristic, restart strategy, seed) race
+    on the same formula in separate processes. The first answer is returned
+    and the other processes are killed. Optionally, the workers share their
+    short learned clauses through a buffer in shared memory.
+'''
+
+import argparse
+import multiprocessing
+import traceback
+
+try:
+    from queue import Empty
+except ImportError:
+    from Queue import Empty
+
+from dpll import Solver, parseDIMACS
+
+# (heuristic, restart) pairs handed out to the workers in turn; with
+# sharing, the one without restarts exports clauses but never imports any
+CONFIGS = [('VSIDS', 'luby'), ('VSIDS', 'glucose'), ('JW2', 'luby'), ('VSIDS', 'geometric'),
+           ('JW', 'glucose'), ('JW2', 'geometric'), ('VSIDS', None), ('JW', 'luby')]
+
+SHARE_CAPACITY = 1 << 20  # Ints in the shared clause buffer
+
+#-----------------------------------------------------------------
+
+class SharingSolver(Solver):
+    '''
+    Solver that exports its learned clauses of at most share literals to a
+    shared buffer, and imports the clauses of the other workers on every
+    restart, when it is back at level 0. A worker whose restart strategy
+    is None never restarts, so it only exports.
+
+    The buffer is append-only: each record is the owner, the length and the
+    literals. Sharing simply stops once it is full.
+    '''
+    def __init__(self, clauses, heuristic, restart, seed, buffer, head, owner, share):
+        self.buffer = buffer  # multiprocessing.Array of ints
+        self.head = head  # multiprocessing.Value: end of the records written so far
+        self.owner = owner
+        self.share = share
+        self.read = 0  # End of the records already imported
+        Solver.__init__(self, clauses, heuristic, restart, seed)
+
+    def backtrack(self, b, learned_clause):
+        Solver.backtrack(self, b, learned_clause)
+        if len(learned_clause) <= self.share:
+            self.export_clause(learned_clause)
+
+    def restart_search(self):
+        Solver.restart_search(self)
+        self.import_clauses()
+
+    def export_clause(self, clause):
+        '''
+        Append a record for clause to the shared buffer, if it fits.
+        '''
+        with self.head.get_lock():
+            start = self.head.value
+            end = start + 2 + len(clause)
+            if end > len(self.buffer):
+                return
+            self.buffer[start] = self.owner
+            self.buffer[start + 1] = len(clause)
+            self.buffer[start + 2:end] = list(clause)
+            self.head.value = end
+
+    def import_clauses(self):
+        '''
+        Add the clauses the other workers exported since the last import.
+        '''
+        # Records before head are complete: head moves after the write
+        end = self.head.value
+        records = self.buffer[self.read:end]
+        self.read = end
+        i = 0
+        while i < len(records):
+            owner, size = records[i], records[i + 1]
+            if owner != self.owner:
+                self.add_clause(records[i + 2:i + 2 + size])
+            i += 2 + size
+
+#-----------------------------------------------------------------
+
+def portfolioWorker(index, clauses, config, share, buffer, head, results):
+    '''
+    Solve clauses with one configuration and report (index, result, model)
+    on the results queue; errors are reported as ('ERROR', traceback).
+    '''
+    heuristic, restart, seed = config
+    try:
+        if share:
+            solver = SharingSolver(clauses, heuristic, restart, seed, buffer, head, index, share)
+        else:
+            solver = Solver(clauses, heuristic, restart, seed)
+        result = solver.solve()
+        model = solver.get_model() if result == 'SATISFIABLE' else None
+        results.put((index, result, model))
+    except Exception:
+        results.put((index, 'ERROR', traceback.format_exc()))
+
+def solvePortfolio(clauses, processes=None, configs=None, share=0):
+    '''
+    Race several solvers on clauses, one process each, and return
+    (result, model, config) from the first to finish. model is None
+    unless the result is 'SATISFIABLE'.
+
+    configs is a list of (heuristic, restart, seed) triples; by default
+    processes of them (one per CPU) are made from CONFIGS with seeds
+    0, 1, 2, ... With share > 0, learned clauses of up to share literals
+    are passed between the workers.
+    '''
+    clauses = [list(clause) for clause in clauses]
+    if configs is None:
+        processes = processes or multiprocessing.cpu_count()
+        configs = [CONFIGS[i % len(CONFIGS)] + (i,) for i in range(processes)]
+    buffer = multiprocessing.Array('i', SHARE_CAPACITY if share else 1, lock=False)
+    head = multiprocessing.Value('l', 0)
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=portfolioWorker,
+                                       args=(i, clauses, config, share, buffer, head, results))
+               for i, config in enumerate(configs)]
+    for worker in workers:
+        worker.daemon = True
+        worker.start()
+    try:
+        errors = []
+        while len(errors) < len(workers):
+            try:
+                index, result, model = results.get(timeout=1)
+            except Empty:
+                # A worker killed from outside never reports back
+                if not any(worker.is_alive() for worker in workers) and results.empty():
+                    errors.append('worker exited without an answer')
+                    break
+                continue
+            if result != 'ERROR':
+                return result, model, configs[index]
+            errors.append(model)
+        raise RuntimeError('Every portfolio worker failed:\n' + '\n'.join(errors))
+    finally:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.join()
+
+#-----------------------------------------------------------------
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Solve a DIMACS CNF file with a portfolio of solvers.')
+    parser.add_argument('file', help='DIMACS .cnf file, optionally compressed')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='number of solvers to run (default: one per CPU)')
+    parser.add_argument('--share', type=int, default=0,
+                        help='share learned clauses of up to this many literals')
+    args = parser.parse_args()
+
+    result, model, config = solvePortfolio(parseDIMACS(args.file), args.processes, share=args.share)
+    print(repr(result))
@@ -0,0 +1,375 @@
+'''
+    CNF simplification run before search by the Solver in dpll.py
+
+    Unit propagation, pure literals, subsumption and self-subsuming
+    resolution, bounded variable elimination and failed-literal probing,
+    all over an occurrence index. Eliminated variables are recorded so
+    that any model of the simplified clauses can be extended to one of
+    the original clauses.
+'''
+
+# Variables with more occurrences than this on both sides are not eliminated
+ELIM_OCCURS = 16
+# Resolvents longer than this stop the elimination of a variable
+ELIM_LENGTH = 24
+# Clause visits that failed-literal probing may make, over the whole run
+PROBE_BUDGET = 200000
+
+#-----------------------------------------------------------------
+
+class Simplifier:
+    '''
+    Clause database with an occurrence index. Each clause is a set of
+    literals, or None once it has been removed. Units are not stored as
+    clauses; they are assigned and propagated straight away.
+    '''
+    def __init__(self, clauses, frozen=()):
+        self.clauses = []
+        self.pos = [set()]  # Clauses containing the positive literal of each variable
+        self.neg = [set()]  # Negative literal
+        self.value = [0]  # Fixed value of each variable (0, -1 or 1)
+        self.eliminated = [False]  # Whether each variable was eliminated
+        self.occurred = [False]  # Whether each variable is in self.variables
+        self.variables = []  # Variables of the original clauses, in order of first occurrence
+        self.frozen = set(frozen)  # Variables never to eliminate, e.g. future assumptions
+        self.units = []  # Assigned literals still to propagate
+        self.fixed = []  # Every assigned literal
+        self.stack = []  # (pivot, clause) pairs removed by elimination, oldest first
+        self.queue = set()  # Clauses added or strengthened since the last subsumption pass
+        self.touched = set()  # Variables whose clauses changed since the last elimination pass
+        self.probed = set()  # Variables already probed
+        self.probe_budget = PROBE_BUDGET
+        self.ok = True  # False once the clauses are known to be unsatisfiable
+        for clause in clauses:
+            for lit in clause:
+                var = abs(lit)
+                if var >= len(self.value):
+                    self.grow(var)
+                if not self.occurred[var]:
+                    self.occurred[var] = True
+                    self.variables.append(var)
+            self.add(clause)
+
+    def grow(self, nvars):
+        '''
+        Extend the per-variable lists to hold variables up to nvars.
+        '''
+        extra = nvars + 1 - len(self.value)
+        self.pos.extend([set() for _ in range(extra)])
+        self.neg.extend([set() for _ in range(extra)])
+        self.value.extend([0] * extra)
+        self.eliminated.extend([False] * extra)
+        self.occurred.extend([False] * extra)
+
+    def occurs(self, lit):
+        return self.pos[lit] if lit > 0 else self.neg[-lit]
+
+    def is_true(self, lit):
+        return self.value[abs(lit)] == (1 if lit > 0 else -1)
+
+    def add(self, clause):
+        '''
+        Add a clause, dropping duplicate and false literals. Tautologies
+        and satisfied clauses are skipped and units are assigned.
+        '''
+        clause = set(clause)
+        for lit in list(clause):
+            if -lit in clause or self.is_true(lit):
+                return
+            if self.value[abs(lit)] != 0:
+                clause.discard(lit)
+        if len(clause) <= 1:
+            if clause:
+                self.assign(clause.pop())
+            else:
+                self.ok = False
+            return
+        i = len(self.clauses)
+        self.clauses.append(clause)
+        for lit in clause:
+            self.occurs(lit).add(i)
+            self.touched.add(abs(lit))
+        self.queue.add(i)
+
+    def remove(self, i):
+        for lit in self.clauses[i]:
+            self.occurs(lit).discard(i)
+            self.touched.add(abs(lit))
+        self.clauses[i] = None
+
+    def strengthen(self, i, lit):
+        '''
+        Remove lit from clause i. A clause left with one literal becomes
+        an assignment.
+        '''
+        clause = self.clauses[i]
+        clause.discard(lit)
+        self.occurs(lit).discard(i)
+        self.touched.add(abs(lit))
+        if len(clause) == 1:
+            unit = next(iter(clause))
+            self.remove(i)
+            self.assign(unit)
+        else:
+            self.queue.add(i)
+
+    def assign(self, lit):
+        var = abs(lit)
+        if self.value[var] != 0:
+            if not self.is_true(lit):
+                self.ok = False
+            return
+        self.value[var] = 1 if lit > 0 else -1
+        self.fixed.append(lit)
+        self.units.append(lit)
+
+    def live(self):
+        '''
+        Number of clauses left, for telling whether a round changed anything.
+        '''
+        return len(self.clauses) - self.clauses.count(None) + len(self.fixed)
+
+    #-------------------------------------------------------------
+
+    def run(self):
+        '''
+        Apply every technique in turn until a round changes nothing.
+        Returns False if the clauses turned out to be unsatisfiable.
+        '''
+        before = None
+        while self.ok and before != (self.live(), len(self.stack)):
+            before = (self.live(), len(self.stack))
+            self.propagate()
+            self.pure_literals()
+            self.subsume()
+            self.propagate()
+            self.eliminate()
+            self.propagate()
+            self.probe()
+        return self.ok
+
+    def propagate(self):
+        '''
+        Unit propagation to fixpoint: clauses with a true literal are
+        removed and false literals are dropped from the rest.
+        '''
+        while self.units and self.ok:
+            lit = self.units.pop()
+            for i in list(self.occurs(lit)):
+                self.remove(i)
+            for i in list(self.occurs(-lit)):
+                if self.clauses[i] is not None:
+                    self.strengthen(i, -lit)
+
+    def pure_literals(self):
+        '''
+        Eliminate the variables that occur with one sign only, by removing
+        every clause that contains them.
+        '''
+        changed = True
+        while changed:
+            changed = False
+            for var in self.variables:
+                if self.value[var] or self.eliminated[var] or var in self.frozen:
+                    continue
+                if self.pos[var] and not self.neg[var]:
+                    lit = var
+                elif self.neg[var] and not self.pos[var]:
+                    lit = -var
+                else:
+                    continue
+                self.eliminated[var] = True
+                self.stack.append((lit, (lit,)))
+                for i in list(self.occurs(lit)):
+                    self.remove(i)
+                changed = True
+
+    def subsume(self):
+        '''
+        Remove every clause that is a superset of another, and strengthen
+        clauses by self-subsuming resolution: when c minus l is contained
+        in d and d contains -l, -l can be dropped from d. Only clauses in
+        self.queue are tried as the smaller clause c, shortest first.
+        '''
+        while self.queue and self.ok:
+            queue = sorted(self.queue, key=lambda i: len(self.clauses[i]) if self.clauses[i] else 0)
+            self.queue = set()
+            for i in queue:
+                c = self.clauses[i]
+                if c is None:
+                    continue
+                # Every candidate d contains a literal of c or its negation,
+                # so one literal's occurrences are enough to look through
+                lit = min(c, key=lambda x: len(self.pos[abs(x)]) + len(self.neg[abs(x)]))
+                for j in list(self.occurs(lit)) + list(self.occurs(-lit)):
+                    d = self.clauses[j]
+                    if j == i or d is None or len(d) < len(c):
+                        continue
+                    r = self.subsumes(c, d)
+                    if r == 0:
+                        self.remove(j)
+                    elif r is not None:
+                        self.strengthen(j, r)
+                if self.units:
+                    self.propagate()
+
+    def subsumes(self, c, d):
+        '''
+        0 if c is a subset of d, the literal of d that self-subsuming
+        resolution with c removes, or None.
+        '''
+        removed = 0
+        for lit in c:
+            if lit in d:
+                continue
+            if -lit in d and not removed:
+                removed = -lit
+                continue
+            return None
+        return removed
+
+    def eliminate(self):
+        '''
+        Bounded variable elimination: replace the clauses of a variable by
+        all their non-tautological resolvents on it, when there are no
+        more resolvents than clauses. The clauses removed go on self.stack
+        for extend(). Only variables whose clauses changed since the last
+        pass are tried again.
+        '''
+        candidates = [var for var in self.touched
+                      if not self.value[var] and not self.eliminated[var] and var not in self.frozen]
+        self.touched = set()
+        candidates.sort(key=lambda var: len(self.pos[var]) * len(self.neg[var]))
+        for var in candidates:
+            if not self.ok:
+                return
+            pos, neg = self.pos[var], self.neg[var]
+            if self.value[var] or not pos or not neg:
+                continue
+            if len(pos) > ELIM_OCCURS and len(neg) > ELIM_OCCURS:
+                continue
+            resolvents = self.resolvents(var)
+            if resolvents is None:
+                continue
+            self.eliminated[var] = True
+            for i in list(pos):
+                self.stack.append((var, tuple(self.clauses[i])))
+                self.remove(i)
+            for i in list(neg):
+                self.stack.append((-var, tuple(self.clauses[i])))
+                self.remove(i)
+            for clause in resolvents:
+                self.add(clause)
+            self.propagate()
+            # Clauses removed with var may have left others pure or subsumed
+            self.subsume()
+
+    def resolvents(self, var):
+        '''
+        The non-tautological resolvents of the clauses of var, or None if
+        there are more of them than clauses or one is too long.
+        '''
+        limit = len(self.pos[var]) + len(self.neg[var])
+        resolvents = []
+        for i in self.pos[var]:
+            c = self.clauses[i]
+            for j in self.neg[var]:
+                d = self.clauses[j]
+                if any(-lit in d for lit in c if lit != var):
+                    continue
+                r = (c | d) - set((var, -var))
+                if len(r) > ELIM_LENGTH or len(resolvents) == limit:
+                    return None
+                resolvents.append(r)
+        return resolvents
+
+    def probe(self):
+        '''
+        Failed-literal probing on the variables of binary clauses: if
+        propagating a literal alone leads to a conflict, its negation is a
+        unit. Literals implied by both values of a variable are units too.
+        Each variable is probed once, within PROBE_BUDGET clause visits.
+        '''
+        for var in self.variables:
+            if not self.ok or self.probe_budget <= 0:
+                break
+            if self.value[var] or self.eliminated[var] or var in self.probed:
+                continue
+            self.probed.add(var)
+            if not any(len(self.clauses[i]) == 2 for i in self.pos[var] | self.neg[var]):
+                continue
+            implied_pos = self.probe_literal(var)
+            if implied_pos is None:
+                self.assign(-var)
+                self.propagate()
+                continue
+            implied_neg = self.probe_literal(-var)
+            if implied_neg is None:
+                self.assign(var)
+                self.propagate()
+                continue
+            for lit in implied_pos & implied_neg:
+                self.assign(lit)
+            self.propagate()
+
+    def probe_literal(self, lit):
+        '''
+        Literals implied by lit through unit propagation, without keeping
+        any of them, or None on a conflict.
+        '''
+        true = set([lit])
+        todo = [lit]
+        while todo:
+            x = todo.pop()
+            for i in self.occurs(-x):
+                self.probe_budget -= 1
+                unassigned = None
+                for y in self.clauses[i]:
+                    if y in true:
+                        break
+                    if -y in true:
+                        continue
+                    if unassigned is not None:
+                        break
+                    unassigned = y
+                else:
+                    if unassigned is None:
+                        return None
+                    true.add(unassigned)
+                    todo.append(unassigned)
+        true.discard(lit)
+        return true
+
+    #-------------------------------------------------------------
+
+    def simplified(self):
+        '''
+        The remaining clauses as lists, with a unit clause for every
+        fixed literal.
+        '''
+        return [[lit] for lit in self.fixed] + [list(c) for c in self.clauses if c is not None]
+
+    def extend(self, model):
+        '''
+        Extend a model of the simplified clauses (a list of literals) to
+        every variable of the original clauses, given back in order of
+        first occurrence. Eliminated variables start out false and are
+        made true, last eliminated first, where one of their removed
+        clauses needs it. Variables the original clauses did not have
+        follow, in the order of model.
+        '''
+        value = list(self.value)
+        extra = []
+        for lit in model:
+            if abs(lit) >= len(value):
+                value.extend([0] * (abs(lit) + 1 - len(value)))
+            if abs(lit) >= len(self.occurred) or not self.occurred[abs(lit)]:
+                extra.append(lit)
+            value[abs(lit)] = 1 if lit > 0 else -1
+        for var in self.variables:
+            if value[var] == 0:
+                value[var] = -1
+        for pivot, clause in reversed(self.stack):
+            if not any(value[abs(x)] == (1 if x > 0 else -1) for x in clause):
+                value[abs(pivot)] = 1 if pivot > 0 else -1
+        return [var * value[var] for var in self.variables] + extra